@@ -0,0 +1,324 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import count
+
+import click
+from sqlalchemy import event
+
+# Run from anywhere, the app is imported from the directory above this one
+WEB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, WEB_DIR)
+
+from src import create_app  # noqa: E402
+from src.database import db, Bucket, Item  # noqa: E402
+
+
+@click.command()
+@click.option(
+    "--database-url",
+    default=None,
+    help="Database to benchmark against, defaults to a temporary SQLite database.",
+)
+@click.option("--buckets", default=10, show_default=True, help="Buckets to seed.")
+@click.option("--open-items", default=100, show_default=True, help="Open items per bucket.")
+@click.option(
+    "--completed-items", default=1000, show_default=True, help="Completed items per bucket."
+)
+@click.option("--requests", default=200, show_default=True, help="Requests per endpoint.")
+@click.option(
+    "--url",
+    default=None,
+    help="Benchmark a server running at this URL, using --database-url, instead of in-process.",
+)
+@click.option(
+    "--concurrency", default=1, show_default=True, help="Requests made at once, with --url."
+)
+@click.option("--no-seed", is_flag=True, help="Use the data already in the database.")
+@click.option("--output", type=click.Path(), help="Save the results to this JSON file.")
+@click.option("--compare", type=click.Path(exists=True), help="Compare with earlier results.")
+def bench(
+    database_url,
+    buckets,
+    open_items,
+    completed_items,
+    requests,
+    url,
+    concurrency,
+    no_seed,
+    output,
+    compare,
+):
+    if url and database_url is None:
+        raise click.UsageError("--url needs the --database-url of the server.")
+    if concurrency > 1 and not url:
+        raise click.UsageError("--concurrency needs --url, in-process requests are made in turn.")
+    if database_url is None:
+        database_url = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    if not no_seed:
+        _manage(database_url, "create_db")
+        _manage(
+            database_url,
+            "seed_benchmark_db",
+            f"--buckets={buckets}",
+            f"--open-items={open_items}",
+            f"--completed-items={completed_items}",
+        )
+
+    os.environ["DATABASE_URL"] = database_url
+    app = create_app()
+    app.config["WTF_CSRF_ENABLED"] = False
+    with app.app_context():
+        if url:
+            queries = None  # Made by the server, so they cannot be counted here
+            client = _HttpClient(url)
+        else:
+            queries = _count_queries(db.engine)
+            client = app.test_client()
+        endpoints = {
+            name: _run(client, scenario, requests, concurrency, queries)
+            for name, scenario in SCENARIOS
+        }
+        dataset = {
+            "buckets": Bucket.query.count(),
+            "open_items": Item.query.filter(Item.completed_time.is_(None)).count(),
+            "items": Item.query.count(),
+        }
+        database = db.engine.url.render_as_string(hide_password=True)
+
+    results = {
+        "commit": _current_commit(),
+        "created_time": datetime.utcnow().isoformat(),
+        "database": database,
+        "server": url or "in-process",
+        "dataset": dataset,
+        "requests_per_endpoint": requests,
+        "concurrency": concurrency,
+        "endpoints": endpoints,
+    }
+    _report(results, _load(compare) if compare else None)
+    if output:
+        with open(output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+# Each scenario makes one request, and is given a context holding the bucket under test and
+# a counter so that requests which change an item can each use a different one
+def _bucket_page(client, context):
+    return client.get(f"/bucket/{context['bucket_id']}/")
+
+
+def _bucket_page_uncached(client, context):
+    return client.get(f"/bucket/{context['bucket_id']}/?after=0")
+
+
+def _bucket_items_fragment(client, context):
+    return client.get(f"/bucket/{context['bucket_id']}/items/?after=0")
+
+
+def _quick_create_item(client, context):
+    return client.post(f"/bucket/{context['bucket_id']}/", data={"title": "Benchmark item"})
+
+
+def _create_bucket_form(client, context):
+    return client.get("/bucket/create/")
+
+
+def _update_bucket(client, context):
+    return client.post(
+        f"/bucket/{context['bucket_id']}/update/",
+        data={"title": "Benchmark 1", "description": f"Updated {next(context['counter'])}"},
+    )
+
+
+def _create_item(client, context):
+    return client.post(
+        f"/bucket/{context['bucket_id']}/item/create/",
+        data={"title": "Benchmark item", "due_date": "2030-01-01", "flagged": True},
+    )
+
+
+def _flag_item(client, context):
+    return client.get(f"/bucket/{context['bucket_id']}/item/{_next_item(context)}/flag/")
+
+
+def _complete_item(client, context):
+    return client.get(f"/bucket/{context['bucket_id']}/item/{_next_item(context)}/complete/")
+
+
+def _api_bulk_reschedule(client, context):
+    item_ids = [_next_item(context) for _ in range(50)]
+    return client.post(
+        "/api/v1/items/reschedule/", json={"ids": item_ids, "due_date": "2030-01-01"}
+    )
+
+
+SCENARIOS = [
+    ("bucket_page", _bucket_page),
+    ("bucket_page_uncached", _bucket_page_uncached),
+    ("bucket_items_fragment", _bucket_items_fragment),
+    ("create_bucket_form", _create_bucket_form),
+    ("update_bucket", _update_bucket),
+    ("create_item", _create_item),
+    ("quick_create_item", _quick_create_item),
+    ("flag_item", _flag_item),
+    ("api_bulk_reschedule", _api_bulk_reschedule),
+    ("complete_item", _complete_item),
+]
+
+
+def _next_item(context):
+    item_ids = context["item_ids"]
+    return item_ids[next(context["counter"]) % len(item_ids)]
+
+
+def _run(client, scenario, requests, concurrency, queries):
+    bucket = Bucket.query.filter_by(title="Benchmark 1").one()
+    context = {
+        "bucket_id": bucket.id,
+        "item_ids": [item.id for item in bucket.incomplete_items],
+        "counter": count(),
+    }
+    db.session.remove()
+    scenario(client, context)  # Warm up
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as executor:
+            results = list(
+                executor.map(lambda _: _timed(client, scenario, context), range(requests))
+            )
+        query_counts = None
+    else:
+        results = []
+        query_counts = []
+        for _ in range(requests):
+            if queries is not None:
+                queries[0] = 0
+            results.append(_timed(client, scenario, context))
+            if queries is not None:
+                query_counts.append(queries[0])
+    elapsed = time.perf_counter() - started
+    timings = sorted(timing for timing, _ in results)
+    for _, response in results:
+        if response.status_code >= 400:
+            raise click.ClickException(f"{scenario.__name__} failed: {response.status}")
+    return {
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(_percentile(timings, 50) * 1000, 2),
+        "p99_ms": round(_percentile(timings, 99) * 1000, 2),
+        "queries_per_request": round(sum(query_counts) / requests, 2) if query_counts else None,
+    }
+
+
+def _timed(client, scenario, context):
+    started = time.perf_counter()
+    response = scenario(client, context)
+    return time.perf_counter() - started, response
+
+
+def _count_queries(engine):
+    queries = [0]
+
+    def before_cursor_execute(*args):
+        queries[0] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return queries
+
+
+_Response = namedtuple("_Response", ["status_code", "status"])
+
+
+# Makes the scenarios' requests to a running server, in the same way as the Flask test client
+class _HttpClient(object):
+    def __init__(self, base_url):
+        self._base_url = base_url.rstrip("/")
+        # Redirects are returned rather than followed, as they are by the test client
+        self._opener = urllib.request.build_opener(_NoRedirectHandler)
+
+    def get(self, path, headers=None):
+        return self._request(urllib.request.Request(self._base_url + path, headers=headers or {}))
+
+    def post(self, path, **kwargs):
+        if "json" in kwargs:
+            body = json.dumps(kwargs["json"]).encode()
+            content_type = "application/json"
+        else:
+            body = urllib.parse.urlencode(kwargs.get("data", {})).encode()
+            content_type = "application/x-www-form-urlencoded"
+        request = urllib.request.Request(
+            self._base_url + path, data=body, headers={"Content-Type": content_type}
+        )
+        return self._request(request)
+
+    def _request(self, request):
+        try:
+            with self._opener.open(request) as response:
+                response.read()
+                return _Response(response.status, f"{response.status} {response.reason}")
+        except urllib.error.HTTPError as error:
+            return _Response(error.code, f"{error.code} {error.reason}")
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args):
+        return None
+
+
+def _percentile(sorted_values, percent):
+    index = max(0, int(round(percent / 100 * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+
+def _report(results, baseline):
+    click.echo(f"{results['database']} {results['dataset']}")
+    click.echo(f"{results['server']}, concurrency {results['concurrency']}")
+    click.echo(f"{'endpoint':<24}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'queries':>10}")
+    for name, result in results["endpoints"].items():
+        queries = result["queries_per_request"]
+        line = (
+            f"{name:<24}{result['requests_per_second']:>10}{result['p50_ms']:>10}"
+            f"{result['p99_ms']:>10}{'-' if queries is None else queries:>10}"
+        )
+        previous = baseline["endpoints"].get(name) if baseline else None
+        if previous:
+            change = result["requests_per_second"] / previous["requests_per_second"] - 1
+            line += f"  {change:+.0%} req/s vs {baseline['commit'][:8]}"
+        click.echo(line)
+
+
+def _manage(database_url, *args):
+    subprocess.run(
+        [sys.executable, "manage.py", *args],
+        cwd=WEB_DIR,
+        env={**os.environ, "DATABASE_URL": database_url},
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def _current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=WEB_DIR, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def _load(path):
+    with open(path) as results_file:
+        return json.load(results_file)
+
+
+if __name__ == "__main__":
+    bench()
@@ -1,6 +1,16 @@
+from datetime import datetime
+
 import pytest
 from src import create_app
-from src.database import db
+from src.config import Config
+from src.database import db, Bucket, Item
+
+
+@pytest.fixture(autouse=True)
+def memory_page_cache(monkeypatch):
+    # Each test caches pages in the memory of its own app, as on disk they would outlive the
+    # test's database
+    monkeypatch.setattr(Config, "PAGE_CACHE_DIR", None)
 
 
 @pytest.fixture
@@ -20,3 +30,30 @@ def test_client():
     db.drop_all()
     # Clean up the app context after the test
     ctx.pop()
+
+
+@pytest.fixture
+def factory(test_client):
+    return _Factory()
+
+
+# Creates and commits buckets and items for tests
+class _Factory(object):
+    def bucket(self, title="Shopping", description="Groceries we need", item_titles=None):
+        bucket = Bucket(title=title, description=description)
+        for item_title in item_titles or list():
+            bucket.items.append(Item(title=item_title))
+        db.session.add(bucket)
+        db.session.commit()
+        return bucket
+
+    def item(self, bucket, title="Task", completed=False, **columns):
+        if completed:
+            columns["completed_time"] = datetime.utcnow()
+        item = Item(bucket=bucket, title=title, **columns)
+        db.session.add(item)
+        db.session.commit()
+        return item
+
+    def items(self, bucket, titles):
+        return [self.item(bucket, title) for title in titles]
@@ -4,13 +4,45 @@ if [ "$DATABASE" = "postgres" ]
 then
     echo "Waiting for postgres..."
 
-    while ! nc -z $SQL_HOST $SQL_PORT; do
+    # Checked every 0.1s, giving up after SQL_WAIT_SECONDS (defaults to 30)
+    checks=$(( ${SQL_WAIT_SECONDS:-30} * 10 ))
+    while ! nc -z -w 1 $SQL_HOST $SQL_PORT; do
+      checks=$((checks - 1))
+      if [ $checks -le 0 ]
+      then
+          echo "PostgreSQL did not start"
+          exit 1
+      fi
       sleep 0.1
     done
 
     echo "PostgreSQL started"
 fi
 
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]
+then
+    # Metrics files left by a previous run would be counted again
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
+if [ -n "$PAGE_CACHE_DIR" ]
+then
+    # Pages cached by a previous run may be of data changed since
+    rm -rf "$PAGE_CACHE_DIR"
+    mkdir -p "$PAGE_CACHE_DIR"
+fi
+
+# The prod web service runs gunicorn with gunicorn.conf.py, configured by:
+#   GUNICORN_WORKER_CLASS       gevent (default), sync or gthread
+#   GUNICORN_WORKERS            processes, defaults to 2 x CPUs + 1
+#   GUNICORN_THREADS            threads per process for gthread, defaults to 1
+#   GUNICORN_WORKER_CONNECTIONS concurrent requests per gevent process, defaults to 1000
+#   GUNICORN_TIMEOUT            seconds before a silent worker is restarted, defaults to 30
+#   GUNICORN_PRELOAD            load the app once before forking the workers, defaults to true
+# Each process has its own database pool of DB_POOL_SIZE + DB_MAX_OVERFLOW connections,
+# which across all processes must stay below the Postgres max_connections.
+
 if [ "$FLASK_ENV" = "development" ]
 then
     echo "Creating the database tables..."
@@ -0,0 +1,50 @@
+import os
+
+# Gevent workers serve many requests at once per process, each waiting on Postgres without
+# blocking the others. GUNICORN_WORKER_CLASS=sync (or gthread with GUNICORN_THREADS) gives
+# one request per process (or thread) at a time instead.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+
+if worker_class == "gevent":
+    # Patched before anything else is imported (prometheus_client, for one, imports ssl and
+    # threading, so it is only imported by child_exit) and before the app is loaded, so that
+    # the modules workers inherit from the master wait on sockets through gevent. psycopg2 is
+    # a C extension, which gevent's monkey patching cannot reach, so it is told to wait for
+    # the database through gevent too.
+    from gevent import monkey
+    from psycogreen.gevent import patch_psycopg
+
+    monkey.patch_all()
+    patch_psycopg()
+
+workers = int(os.getenv("GUNICORN_WORKERS", os.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+# Concurrent requests per gevent worker, these share the worker's database pool so
+# DB_POOL_SIZE + DB_MAX_OVERFLOW limits how many of them can query at once
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+if workers > 1 and os.getenv("PAGE_CACHE_DIR") == "":
+    # Each worker would keep serving the pages it cached after another worker changed them
+    raise RuntimeError("PAGE_CACHE_DIR must be a directory when there is more than one worker")
+# The app is loaded once by the master process before the workers are forked from it, so
+# workers start without importing anything and share the memory of the loaded modules
+# until they write to it
+preload_app = os.getenv("GUNICORN_PRELOAD", "true") == "true"
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Database connections are not shared between processes, so a worker drops any the
+        # master opened whilst loading the app, without closing them for the master
+        from src.database import db
+
+        with server.app.wsgi().app_context():
+            db.engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    # Drop the live gauges (e.g. requests in flight) of workers that have exited, so they
+    # are not included in the totals served by /metrics
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
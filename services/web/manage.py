@@ -1,13 +1,68 @@
-from datetime import date, datetime
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 
+import click
+from flask import current_app
 from flask.cli import FlaskGroup
 from sqlalchemy.exc import OperationalError
 
 from src import create_app
-from src.database import db, Bucket, Item
+from src.archive import archive_items
+from src.cache import page_cache
+from src.database import (
+    db,
+    bucket_count_errors,
+    crowded_buckets,
+    rank_open_items,
+    recount_buckets,
+    refresh_overdue_counts,
+    Bucket,
+    Item,
+    RANK_STEP,
+)
+from src.exporter import export_records
+from src.importer import import_items, InvalidRecord
+
+# Commands that only use the database, which start faster without the views and migrations
+DATABASE_COMMANDS = {
+    "seed_prod_db",
+    "seed_test_db",
+    "seed_benchmark_db",
+    "import",
+    "export",
+    "archive",
+    "recount_buckets",
+    "rank_items",
+}
+# Commands that use migrations but not the views
+MIGRATION_COMMANDS = {"create_db", "upgrade_db", "downgrade_db"}
+# Run in a separate Python by profile_startup, timing each import with -X importtime
+PROFILE_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from src import create_app
+app = create_app(views={views}, migrations={migrations})
+times = {{"total": time.perf_counter() - started, "steps": app.extensions["startup_times"]}}
+print(json.dumps(times))
+"""
+
+
+def _create_app():
+    # Flask's own commands (e.g. run and shell) and the db commands get the whole app
+    context = click.get_current_context(silent=True)
+    command = context.info_name if context else None
+    return create_app(
+        views=command not in DATABASE_COMMANDS | MIGRATION_COMMANDS,
+        migrations=command not in DATABASE_COMMANDS,
+    )
 
 
-cli = FlaskGroup(create_app=create_app)
+cli = FlaskGroup(create_app=_create_app)
 
 
 @cli.command("create_db")
@@ -15,6 +70,23 @@ def create_db():
     _create_db()
 
 
+@cli.command("upgrade_db")
+@click.option("--revision", default="head", help="Revision to upgrade to.")
+def upgrade_db(revision):
+    from flask_migrate import upgrade
+
+    upgrade(revision=revision)
+
+
+@cli.command("downgrade_db")
+@click.option("--revision", default="-1", help="Revision to downgrade to.")
+def downgrade_db(revision):
+    from flask_migrate import downgrade
+
+    downgrade(revision=revision)
+    page_cache.clear()
+
+
 @cli.command("seed_prod_db")
 def seed_prod_db():
     _seed_required_data()
@@ -26,6 +98,221 @@ def seed_test_db():
     _seed_test_data()
 
 
+@cli.command("seed_benchmark_db")
+@click.option("--buckets", default=10, show_default=True, help="Buckets to create.")
+@click.option("--open-items", default=100, show_default=True, help="Open items per bucket.")
+@click.option(
+    "--completed-items", default=1000, show_default=True, help="Completed items per bucket."
+)
+def seed_benchmark_db(buckets, open_items, completed_items):
+    _seed_required_data()
+    _seed_benchmark_data(buckets, open_items, completed_items)
+
+
+@cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(["csv", "jsonl"]),
+    help="Format of the file, defaults to going by its extension.",
+)
+@click.option("--batch-size", default=10000, show_default=True, help="Items inserted at once.")
+def import_file(path, file_format, batch_size):
+    if file_format is None:
+        file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    started = time.perf_counter()
+
+    def progress(records):
+        elapsed = time.perf_counter() - started
+        click.echo(f"Imported {records} records ({elapsed:.1f}s)")
+
+    try:
+        records = import_items(path, file_format, batch_size=batch_size, progress=progress)
+    except InvalidRecord as error:
+        raise click.ClickException(f"{error}, run again to carry on once it is fixed")
+    click.echo(f"Finished importing {records} records")
+
+
+@cli.command("export")
+@click.argument("path", default="-", type=click.Path(dir_okay=False, allow_dash=True))
+@click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(["csv", "jsonl"]),
+    help="Format of the file, defaults to going by its extension, or jsonl for stdout.",
+)
+@click.option("--bucket-id", type=int, help="Only export this bucket and its items.")
+@click.option(
+    "--completed-after", type=click.DateTime(), help="Only items completed at or after this."
+)
+@click.option("--completed-before", type=click.DateTime(), help="Only items completed before this.")
+@click.option("--updated-since", type=click.DateTime(), help="Only items changed at or after this.")
+def export_file(path, file_format, bucket_id, completed_after, completed_before, updated_since):
+    if file_format is None:
+        file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    records = export_records(
+        file_format,
+        bucket_id=bucket_id,
+        completed_after=completed_after,
+        completed_before=completed_before,
+        updated_since=updated_since,
+    )
+    with click.open_file(path, "w") as output:
+        for chunk in records:
+            output.write(chunk)
+
+
+@cli.command("archive")
+@click.option(
+    "--days",
+    type=int,
+    help="Archive items completed more than this many days ago, defaults to ARCHIVE_AFTER_DAYS.",
+)
+@click.option("--batch-size", default=1000, show_default=True, help="Items moved at once.")
+@click.option("--every", type=int, help="Keep running, archiving every this many minutes.")
+def archive(days, batch_size, every):
+    if days is None:
+        days = current_app.config["ARCHIVE_AFTER_DAYS"]
+    while True:
+        completed_before = datetime.utcnow() - timedelta(days=days)
+        archived = archive_items(completed_before, batch_size=batch_size)
+        click.echo(f"Archived {archived} items completed before {completed_before:%Y-%m-%d %H:%M}")
+        if every is None:
+            break
+        db.session.remove()
+        time.sleep(every * 60)
+
+
+@cli.command("recount_buckets")
+@click.option("--verify", is_flag=True, help="Only check the counts, exiting 1 if any are wrong.")
+@click.option(
+    "--overdue", is_flag=True, help="Only count overdue items of buckets counted before today."
+)
+@click.option("--every", type=int, help="Keep running with --overdue every this many minutes.")
+def recount_buckets_command(verify, overdue, every):
+    if overdue or every is not None:
+        _refresh_overdue_counts(every)
+        return
+    errors = bucket_count_errors()
+    for bucket, wrong_counts in errors:
+        for count, kept, actual in wrong_counts:
+            click.echo(f"{bucket.title}: {count} is {kept}, counted {actual}")
+    if verify:
+        if errors:
+            raise SystemExit(1)
+        click.echo("Bucket counts are right")
+        return
+    recount_buckets()
+    db.session.commit()
+    page_cache.invalidate_bucket(*(bucket.id for bucket, _ in errors))
+    click.echo(f"Recounted buckets, {len(errors)} were wrong")
+
+
+@cli.command("rank_items")
+@click.option(
+    "--min-gap",
+    default=RANK_STEP // 64,
+    show_default=True,
+    help="Rank again the items of buckets with items ranked closer together than this.",
+)
+@click.option("--every", type=int, help="Keep running, ranking every this many minutes.")
+def rank_items(min_gap, every):
+    # Items put between others halve the gap between their ranks, so buckets reordered often
+    # run out of gaps, which this spreads out again a bucket at a time
+    while True:
+        bucket_ids = crowded_buckets(min_gap)
+        for bucket_id in bucket_ids:
+            rank_open_items(bucket_id)
+            db.session.commit()
+            page_cache.invalidate_bucket(bucket_id)
+        click.echo(f"Ranked the items of {len(bucket_ids)} buckets again")
+        if every is None:
+            break
+        db.session.remove()
+        time.sleep(every * 60)
+
+
+@cli.command("precompile_templates")
+def precompile_templates():
+    # Templates are cached by their path, so this must run where the app is served from
+    cache_dir = current_app.config["TEMPLATE_CACHE_DIR"]
+    if not cache_dir:
+        raise click.ClickException("Set TEMPLATE_CACHE_DIR to the directory to compile them to")
+    os.makedirs(cache_dir, exist_ok=True)
+    names = current_app.jinja_env.list_templates()
+    for name in names:
+        current_app.jinja_env.get_template(name)
+    click.echo(f"Compiled {len(names)} templates to {cache_dir}")
+
+
+@cli.command("profile_startup", with_appcontext=False)
+@click.option("--views/--no-views", default=True, show_default=True, help="Set up the views.")
+@click.option(
+    "--migrations/--no-migrations",
+    default=False,
+    show_default=True,
+    help="Set up migrations, which web workers do not.",
+)
+@click.option("--top", default=15, show_default=True, help="Packages to list.")
+def profile_startup(views, migrations, top):
+    # Starts the app in a new Python, as a worker or command would, and reports the time
+    # taken by each step of create_app and by importing each package along the way
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            PROFILE_SCRIPT.format(views=views, migrations=migrations),
+        ],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = json.loads(result.stdout.splitlines()[-1])
+    click.echo(f"Started in {times['total'] * 1000:.1f} ms")
+    click.echo("\nSteps of create_app, including their imports (ms):")
+    for step, seconds in times["steps"].items():
+        click.echo(f"  {step:<40} {seconds * 1000:>8.1f}")
+    click.echo("\nSlowest packages to import (ms):")
+    for package, microseconds in _import_times(result.stderr)[:top]:
+        click.echo(f"  {package:<40} {microseconds / 1000:>8.1f}")
+
+
+def _import_times(importtime_output):
+    # The time spent importing the modules of each package, from the output of -X importtime,
+    # slowest first
+    times = defaultdict(int)
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_time, _, name = line[len("import time:") :].split("|")
+        if self_time.strip().isdigit():
+            times[name.strip().split(".")[0]] += int(self_time)
+    return sorted(times.items(), key=lambda package_time: package_time[1], reverse=True)
+
+
+def _refresh_overdue_counts(every):
+    # Overdue items are counted as bucket counts are read until their buckets are counted
+    # again for the day, so this keeps the reads to the counts kept
+    while True:
+        today = date.today()
+        bucket_ids = db.session.scalars(
+            db.select(Bucket.id).where(Bucket.overdue_counted_date < today)
+        ).all()
+        refresh_overdue_counts(today)
+        db.session.commit()
+        page_cache.invalidate_bucket(*bucket_ids)
+        click.echo(f"Counted the overdue items of {len(bucket_ids)} buckets again")
+        if every is None:
+            break
+        db.session.remove()
+        time.sleep(every * 60)
+
+
 def _create_db():
     try:
         db.drop_all()
@@ -33,6 +320,13 @@ def _create_db():
         pass  # Likely means database does not exist
     db.create_all()
     db.session.commit()
+    # The schema is already current, so record that for future migrations
+    from flask_migrate import stamp
+
+    stamp()
+    # Pages cached of the buckets dropped would otherwise be served for new buckets with
+    # the same ids
+    page_cache.clear()
 
 
 def _seed_required_data():
@@ -44,6 +338,7 @@ def _seed_required_data():
         )
         db.session.add(inbox)
         db.session.commit()
+        page_cache.invalidate_bucket(inbox.id)
 
 
 def _seed_test_data():
@@ -72,6 +367,48 @@ def _seed_test_data():
     bucket.items.append(Item(title="Version 1.0", due_date=date(2020, 8, 8)))
     db.session.add(bucket)
     db.session.commit()
+    page_cache.invalidate_bucket(bucket.id)
+
+
+def _seed_benchmark_data(bucket_count, open_item_count, completed_item_count, batch_size=10000):
+    today = date.today()
+    now = datetime.utcnow()
+    for bucket_number in range(1, bucket_count + 1):
+        bucket = Bucket(
+            title=f"Benchmark {bucket_number}",
+            description=f"Synthetic bucket {bucket_number} for benchmarking",
+        )
+        db.session.add(bucket)
+        db.session.flush()
+        rows = []
+        for item_number in range(open_item_count + completed_item_count):
+            completed = item_number >= open_item_count
+            rows.append(
+                {
+                    "bucket_id": bucket.id,
+                    "title": f"Item {item_number} of bucket {bucket_number}",
+                    "description": "Synthetic item" if item_number % 3 == 0 else None,
+                    "created_time": now - timedelta(minutes=item_number),
+                    # A mix of overdue, upcoming and undated items
+                    "due_date": (
+                        today + timedelta(days=item_number % 14 - 7)
+                        if item_number % 4 == 0
+                        else None
+                    ),
+                    "completed_time": now - timedelta(hours=item_number) if completed else None,
+                    "flagged": item_number % 10 == 0,
+                    "rank": (item_number + 1) * RANK_STEP,
+                }
+            )
+            if len(rows) == batch_size:
+                db.session.execute(db.insert(Item), rows)
+                rows = []
+        if rows:
+            db.session.execute(db.insert(Item), rows)
+        recount_buckets([bucket.id])
+        db.session.commit()
+        page_cache.invalidate_bucket(bucket.id)
+        click.echo(f"Seeded {bucket.title}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+"""bucket item counts
+
+Revision ID: 111a34d79890
+Revises: 226c481c582a
+Create Date: 2026-10-18 20:05:36.308184
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "111a34d79890"
+down_revision = "226c481c582a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("bucket", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("open_count", sa.Integer(), server_default="0", nullable=False)
+        )
+        batch_op.add_column(
+            sa.Column("overdue_count", sa.Integer(), server_default="0", nullable=False)
+        )
+        batch_op.add_column(
+            sa.Column("flagged_count", sa.Integer(), server_default="0", nullable=False)
+        )
+        batch_op.add_column(sa.Column("overdue_counted_date", sa.Date(), nullable=True))
+    # Count the items of existing buckets
+    op.execute("""
+        UPDATE bucket SET
+            open_count = (
+                SELECT count(*) FROM item
+                WHERE item.bucket_id = bucket.id AND item.completed_time IS NULL
+            ),
+            overdue_count = (
+                SELECT count(*) FROM item
+                WHERE item.bucket_id = bucket.id AND item.completed_time IS NULL
+                AND item.due_date < CURRENT_DATE
+            ),
+            flagged_count = (
+                SELECT count(*) FROM item
+                WHERE item.bucket_id = bucket.id AND item.completed_time IS NULL
+                AND item.flagged
+            ),
+            overdue_counted_date = CURRENT_DATE
+        """)
+    with op.batch_alter_table("bucket", schema=None) as batch_op:
+        batch_op.alter_column("overdue_counted_date", existing_type=sa.Date(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table("bucket", schema=None) as batch_op:
+        batch_op.drop_column("overdue_counted_date")
+        batch_op.drop_column("flagged_count")
+        batch_op.drop_column("overdue_count")
+        batch_op.drop_column("open_count")
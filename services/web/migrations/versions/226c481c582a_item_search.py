@@ -0,0 +1,60 @@
+"""item search
+
+Revision ID: 226c481c582a
+Revises: 927efec54f90
+Create Date: 2026-10-18 19:54:02.834791
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "226c481c582a"
+down_revision = "927efec54f90"
+branch_labels = None
+depends_on = None
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS item_search USING fts5(title, description, "
+    "content='item', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS item_search_insert AFTER INSERT ON item BEGIN "
+    "INSERT INTO item_search (rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS item_search_delete AFTER DELETE ON item BEGIN "
+    "INSERT INTO item_search (item_search, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS item_search_update AFTER UPDATE OF title, description ON item "
+    "BEGIN INSERT INTO item_search (item_search, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO item_search (rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+]
+
+
+def upgrade():
+    if op.get_context().dialect.name == "sqlite":
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        # Index the items that already exist
+        op.execute("INSERT INTO item_search (item_search) VALUES ('rebuild')")
+        return
+    # Built concurrently so a live item table stays writable, see the hot path indexes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_item_search",
+            "item",
+            [sa.text("to_tsvector('english', title || ' ' || coalesce(description, ''))")],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    if op.get_context().dialect.name == "sqlite":
+        for trigger in ["item_search_insert", "item_search_delete", "item_search_update"]:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS item_search")
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_item_search", table_name="item", postgresql_concurrently=True)
@@ -0,0 +1,57 @@
+"""item rank
+
+Revision ID: 343aaaf45002
+Revises: 111a34d79890
+Create Date: 2026-10-18 20:11:55.937544
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "343aaaf45002"
+down_revision = "111a34d79890"
+branch_labels = None
+depends_on = None
+
+OPEN = "completed_time IS NULL"
+RANK_STEP = 1024
+
+
+def upgrade():
+    with op.batch_alter_table("item", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("rank", sa.BigInteger(), nullable=True))
+    # Existing items keep their order, which was by id
+    op.execute(f"UPDATE item SET rank = id * {RANK_STEP}")
+    with op.batch_alter_table("item", schema=None) as batch_op:
+        batch_op.alter_column("rank", existing_type=sa.BigInteger(), nullable=False)
+    # The open items of a bucket are now read in order of rank, see 8954ddf472af for why the
+    # index is built concurrently
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_item_open_bucket_id_rank",
+            "item",
+            ["bucket_id", "rank", "id"],
+            postgresql_where=sa.text(OPEN),
+            postgresql_concurrently=True,
+            sqlite_where=sa.text(OPEN),
+        )
+        op.drop_index("ix_item_open_bucket_id", table_name="item", postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_item_open_bucket_id",
+            "item",
+            ["bucket_id", "id"],
+            postgresql_where=sa.text(OPEN),
+            postgresql_concurrently=True,
+            sqlite_where=sa.text(OPEN),
+        )
+        op.drop_index(
+            "ix_item_open_bucket_id_rank", table_name="item", postgresql_concurrently=True
+        )
+    with op.batch_alter_table("item", schema=None) as batch_op:
+        batch_op.drop_column("rank")
@@ -0,0 +1,47 @@
+"""initial schema
+
+Revision ID: 81b6dc501e29
+Revises:
+Create Date: 2026-10-18 09:12:41.385913
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "81b6dc501e29"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "bucket",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=32), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("can_deactivate", sa.Boolean(), nullable=False),
+        sa.Column("deactivated_time", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("title"),
+    )
+    op.create_table(
+        "item",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("bucket_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=128), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_time", sa.DateTime(), nullable=False),
+        sa.Column("due_date", sa.Date(), nullable=True),
+        sa.Column("completed_time", sa.DateTime(), nullable=True),
+        sa.Column("flagged", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(["bucket_id"], ["bucket.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("item")
+    op.drop_table("bucket")
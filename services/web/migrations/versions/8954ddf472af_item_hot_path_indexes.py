@@ -0,0 +1,46 @@
+"""item hot path indexes
+
+Revision ID: 8954ddf472af
+Revises: 81b6dc501e29
+Create Date: 2026-10-18 19:31:58.741195
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "8954ddf472af"
+down_revision = "81b6dc501e29"
+branch_labels = None
+depends_on = None
+
+OPEN = "completed_time IS NULL"
+
+INDEXES = [
+    ("ix_item_bucket_id_completed_time", ["bucket_id", "completed_time"], None),
+    ("ix_item_open_bucket_id", ["bucket_id", "id"], OPEN),
+    ("ix_item_open_due_date", ["due_date"], f"{OPEN} AND due_date IS NOT NULL"),
+    ("ix_item_open_flagged", ["bucket_id"], f"{OPEN} AND flagged"),
+]
+
+
+def upgrade():
+    # Build the indexes concurrently on Postgres so a live item table stays writable,
+    # which has to happen outside of the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(
+                name,
+                "item",
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                sqlite_where=sa.text(where) if where else None,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name="item", postgresql_concurrently=True)
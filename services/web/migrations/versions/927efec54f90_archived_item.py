@@ -0,0 +1,47 @@
+"""archived item
+
+Revision ID: 927efec54f90
+Revises: a0a116143a2e
+Create Date: 2026-10-18 19:51:43.605893
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "927efec54f90"
+down_revision = "a0a116143a2e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "archived_item",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("bucket_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=128), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_time", sa.DateTime(), nullable=False),
+        sa.Column("due_date", sa.Date(), nullable=True),
+        sa.Column("completed_time", sa.DateTime(), nullable=False),
+        sa.Column("flagged", sa.Boolean(), nullable=False),
+        sa.Column("updated_time", sa.DateTime(), nullable=False),
+        sa.Column("archived_time", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["bucket_id"], ["bucket.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("archived_item", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_archived_item_bucket_id_completed_time",
+            ["bucket_id", "completed_time", "id"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("archived_item", schema=None) as batch_op:
+        batch_op.drop_index("ix_archived_item_bucket_id_completed_time")
+
+    op.drop_table("archived_item")
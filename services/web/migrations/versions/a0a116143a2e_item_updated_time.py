@@ -0,0 +1,32 @@
+"""item updated time
+
+Revision ID: a0a116143a2e
+Revises: 8954ddf472af
+Create Date: 2026-10-18 21:12:40.118204
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "a0a116143a2e"
+down_revision = "8954ddf472af"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("item", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("updated_time", sa.DateTime(), nullable=True))
+    # The last change we know of for existing items is when they were created or completed
+    op.execute("UPDATE item SET updated_time = COALESCE(completed_time, created_time)")
+    with op.batch_alter_table("item", schema=None) as batch_op:
+        batch_op.alter_column("updated_time", existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index("ix_item_updated_time", ["updated_time"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("item", schema=None) as batch_op:
+        batch_op.drop_index("ix_item_updated_time")
+        batch_op.drop_column("updated_time")
@@ -1,16 +1,74 @@
+import time
+from contextlib import contextmanager
+
 from flask import Flask
 
 
-def create_app():
+# views=False leaves out the pages, API and metrics, for commands that only use the
+# database, and migrations=False leaves out Flask-Migrate (and with it Alembic), which web
+# workers never use. The time taken to import and set up each part is kept in
+# app.extensions["startup_times"], see manage.py profile_startup.
+def create_app(views=True, migrations=True):
     app = Flask(__name__)
     app.config.from_object("src.config.Config")
+    app.extensions["startup_times"] = {}
+
+    with _startup_step(app, "database"):
+        from .database import db
+
+        db.init_app(app)
+
+    if migrations:
+        with _startup_step(app, "migrations"):
+            from flask_migrate import Migrate
+
+            from .database import include_name
+
+            Migrate(app, db, render_as_batch=True, include_name=include_name)
+
+    with _startup_step(app, "instrumentation"):
+        from . import instrumentation
+
+        instrumentation.init_app(app)
+
+    with _startup_step(app, "cache"):
+        from .cache import page_cache
 
-    from .database import db
+        page_cache.init_app(app)
 
-    db.init_app(app)
+    if views:
+        with _startup_step(app, "metrics"):
+            from . import metrics
 
-    from .views import bp as views_blueprint
+            metrics.init_app(app)
 
-    app.register_blueprint(views_blueprint)
+        with _startup_step(app, "dates"):
+            from . import dates
+
+            dates.init_app(app)
+
+        with _startup_step(app, "views"):
+            if app.config["TEMPLATE_CACHE_DIR"]:
+                from jinja2 import FileSystemBytecodeCache
+
+                app.jinja_env.bytecode_cache = FileSystemBytecodeCache(
+                    app.config["TEMPLATE_CACHE_DIR"]
+                )
+
+            from .views import bp as views_blueprint
+
+            app.register_blueprint(views_blueprint)
+
+        with _startup_step(app, "api"):
+            from .api import bp as api_blueprint
+
+            app.register_blueprint(api_blueprint)
 
     return app
+
+
+@contextmanager
+def _startup_step(app, name):
+    started = time.perf_counter()
+    yield
+    app.extensions["startup_times"][name] = time.perf_counter() - started
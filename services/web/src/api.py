@@ -0,0 +1,265 @@
+from datetime import date, datetime
+
+from flask import abort, Blueprint, current_app, jsonify, request, Response, stream_with_context
+from werkzeug.exceptions import HTTPException
+
+from src.cache import page_cache
+from src.database import (
+    db,
+    agenda,
+    bucket_summaries,
+    bulk_delete_items,
+    bulk_update_items,
+    move_items_to_bucket,
+    place_item,
+    statement_timeout,
+    Bucket,
+    Item,
+)
+from src.exporter import export_records, MIMETYPES
+from src.search import search_items
+
+bp = Blueprint("api_v1", __name__, url_prefix="/api/v1")
+
+
+@bp.errorhandler(HTTPException)
+def http_error(error):
+    return jsonify(error=error.description), error.code
+
+
+@bp.route("/buckets/")
+def buckets():
+    return jsonify(buckets=[summary._asdict() for summary in bucket_summaries()])
+
+
+@bp.route("/buckets/<int:bucket_id>/items/")
+def bucket_items(bucket_id):
+    bucket = _get_bucket(bucket_id)
+    page_size = _limit(current_app.config["BUCKET_PAGE_SIZE"])
+    items, next_after_id = bucket.open_items_page(
+        page_size, after_id=request.args.get("after", type=int)
+    )
+    return jsonify(items=[_item_json(item) for item in items], next_after=next_after_id)
+
+
+@bp.route("/agenda/")
+def agenda_items():
+    limit = _limit(current_app.config["BUCKET_PAGE_SIZE"])
+    sections = agenda(date.today(), current_app.config["AGENDA_DUE_SOON_DAYS"], limit)
+    return jsonify(
+        {
+            name: [{**_item_json(item), "bucket": bucket_title} for item, bucket_title in items]
+            for name, items in sections._asdict().items()
+        }
+    )
+
+
+@bp.route("/search/")
+def search():
+    page = max(request.args.get("page", 1, type=int), 1)
+    page_size = _limit(current_app.config["SEARCH_PAGE_SIZE"])
+    results, has_next_page = search_items(request.args.get("q", ""), page_size, page=page)
+    return jsonify(
+        items=[{**_item_json(item), "bucket": bucket_title} for item, bucket_title in results],
+        next_page=page + 1 if has_next_page else None,
+    )
+
+
+@bp.route("/items/complete/", methods=["POST"])
+def complete_items():
+    item_ids = _item_ids()
+    return _bulk_update(
+        item_ids,
+        {"completed_time": datetime.utcnow()},
+        Item.completed_time.is_(None),
+    )
+
+
+@bp.route("/items/flag/", methods=["POST"])
+def flag_items():
+    return _bulk_update(_item_ids(), {"flagged": True})
+
+
+@bp.route("/items/unflag/", methods=["POST"])
+def unflag_items():
+    return _bulk_update(_item_ids(), {"flagged": False})
+
+
+@bp.route("/items/reschedule/", methods=["POST"])
+def reschedule_items():
+    item_ids = _item_ids()
+    due_date = request.json.get("due_date")
+    if due_date is not None:
+        try:
+            due_date = datetime.strptime(due_date, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            abort(400, "due_date must be a YYYY-MM-DD date or null.")
+    return _bulk_update(item_ids, {"due_date": due_date})
+
+
+@bp.route("/items/move/", methods=["POST"])
+def move_items():
+    item_ids = _item_ids()
+    bucket_id = request.json.get("bucket_id")
+    bucket = db.session.get(Bucket, bucket_id) if _is_id(bucket_id) else None
+    if bucket is None:
+        abort(400, "bucket_id must be the id of an existing bucket.")
+    found_items = _existing_items(item_ids)
+    moved_from_bucket_ids = move_items_to_bucket(list(found_items), bucket)
+    db.session.commit()
+    if moved_from_bucket_ids:
+        page_cache.invalidate_bucket(bucket.id, *moved_from_bucket_ids)
+    return _results(item_ids, found_items)
+
+
+@bp.route("/items/<int:item_id>/place/", methods=["POST"])
+def place(item_id):
+    # Puts an open item after another open item of its bucket (after_id), or first (null)
+    item = db.session.get(Item, item_id)
+    if item is None or item.completed_time is not None:
+        abort(404, "No open item with that id.")
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or "after_id" not in data:
+        abort(400, "after_id is required.")
+    after_item = None
+    if data["after_id"] is not None:
+        after_id = data["after_id"]
+        after_item = db.session.get(Item, after_id) if _is_id(after_id) else None
+        if not _can_place_after(item, after_item):
+            abort(400, "after_id must be null or the id of another open item in the same bucket.")
+    place_item(item, after_item)
+    db.session.commit()
+    page_cache.invalidate_bucket(item.bucket_id)
+    return jsonify(_item_json(item))
+
+
+@bp.route("/items/delete/", methods=["POST"])
+def delete_items():
+    item_ids = _item_ids()
+    found_items = _existing_items(item_ids)
+    if found_items:
+        bulk_delete_items(list(found_items))
+    db.session.commit()
+    page_cache.invalidate_bucket(*found_items.values())
+    return _results(item_ids, found_items)
+
+
+@bp.route("/export/")
+@statement_timeout(0)  # Exports take as long as the history is long
+def export():
+    file_format = request.args.get("format", "jsonl")
+    if file_format not in MIMETYPES:
+        abort(400, f"format must be one of {', '.join(sorted(MIMETYPES))}.")
+    bucket_id = request.args.get("bucket_id", type=int)
+    if bucket_id is not None:
+        _get_bucket(bucket_id)
+    records = export_records(
+        file_format,
+        bucket_id=bucket_id,
+        completed_after=_time_arg("completed_after"),
+        completed_before=_time_arg("completed_before"),
+        updated_since=_time_arg("updated_since"),
+    )
+    return Response(
+        stream_with_context(records),
+        mimetype=MIMETYPES[file_format],
+        headers={
+            "Content-Disposition": f"attachment; filename=my-stuff.{file_format}",
+            # Sent on as it is produced rather than buffered by nginx
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@bp.route("/cache/")
+def cache_stats():
+    return jsonify(page_cache.stats())
+
+
+def _bulk_update(item_ids, values, *criteria):
+    # Items that exist but are excluded by the criteria (e.g. completing an item
+    # that is already complete) are reported as ok, as the result is the same
+    found_items = _existing_items(item_ids)
+    if found_items:
+        bulk_update_items(list(found_items), values, *criteria)
+    db.session.commit()
+    page_cache.invalidate_bucket(*found_items.values())
+    return _results(item_ids, found_items)
+
+
+def _can_place_after(item, after_item):
+    return (
+        after_item is not None
+        and after_item.id != item.id
+        and after_item.bucket_id == item.bucket_id
+        and after_item.completed_time is None
+    )
+
+
+def _existing_items(item_ids):
+    # Maps the id of each item that exists to the id of its bucket
+    return dict(db.session.query(Item.id, Item.bucket_id).filter(Item.id.in_(item_ids)))
+
+
+def _results(item_ids, found_items):
+    return jsonify(
+        results=[
+            {"id": item_id, "status": "ok" if item_id in found_items else "not_found"}
+            for item_id in item_ids
+        ]
+    )
+
+
+def _item_ids():
+    data = request.get_json(silent=True)
+    item_ids = data.get("ids") if isinstance(data, dict) else None
+    if (
+        not isinstance(item_ids, list)
+        or not item_ids
+        or not all(_is_id(item_id) for item_id in item_ids)
+    ):
+        abort(400, "ids must be a non-empty list of item ids.")
+    if len(item_ids) > current_app.config["API_MAX_BATCH_SIZE"]:
+        abort(400, f"No more than {current_app.config['API_MAX_BATCH_SIZE']} ids at once.")
+    return list(dict.fromkeys(item_ids))
+
+
+def _is_id(value):
+    # JSON true and false are read as bools, which Python counts as ints
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _limit(default):
+    # Numbers of items to read are at least one, and no more than API_MAX_BATCH_SIZE
+    limit = request.args.get("limit", default, type=int)
+    return max(1, min(limit, current_app.config["API_MAX_BATCH_SIZE"]))
+
+
+def _time_arg(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        abort(400, f"{name} must be an ISO 8601 date or time.")
+
+
+def _item_json(item):
+    return {
+        "id": item.id,
+        "bucket_id": item.bucket_id,
+        "title": item.title,
+        "description": item.description,
+        "created_time": item.created_time.isoformat(),
+        "due_date": item.due_date.isoformat() if item.due_date else None,
+        "completed_time": item.completed_time.isoformat() if item.completed_time else None,
+        "flagged": item.flagged,
+    }
+
+
+def _get_bucket(bucket_id):
+    bucket = db.session.get(Bucket, bucket_id)
+    if bucket is None:
+        abort(404, "Bucket not found.")
+    return bucket
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from src.database import db, ArchivedItem, Item
+
+# Columns copied from an item to its archived item, which has no rank as it is not one of
+# the open items of a bucket
+COLUMNS = [column.name for column in Item.__table__.columns if column.name != "rank"]
+
+
+# Moves the items completed before the given time from the item table to the archive,
+# batch_size at a time, so that each transaction is short and the item table stays usable
+# whilst a large backlog is archived. Only open items are shown on the cached bucket pages,
+# so those are not changed by archiving.
+def archive_items(completed_before, batch_size=1000, progress=None):
+    archived = 0
+    last_id = 0
+    while True:
+        # Walking the primary key reads the item table once however many batches there are
+        item_ids = db.session.scalars(
+            db.select(Item.id)
+            .where(Item.id > last_id, Item.completed_time < completed_before)
+            .order_by(Item.id)
+            .limit(batch_size)
+        ).all()
+        if not item_ids:
+            return archived
+        archived_time = db.literal(datetime.utcnow(), db.DateTime)
+        db.session.execute(
+            db.insert(ArchivedItem).from_select(
+                [*COLUMNS, "archived_time"],
+                db.select(*(Item.__table__.c[column] for column in COLUMNS), archived_time).where(
+                    Item.id.in_(item_ids)
+                ),
+            )
+        )
+        # Only completed items are archived, so the buckets' counts of open items stay right
+        db.session.execute(db.delete(Item).where(Item.id.in_(item_ids)))
+        db.session.commit()
+        archived += len(item_ids)
+        last_id = item_ids[-1]
+        if progress:
+            progress(archived)
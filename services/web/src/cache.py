@@ -0,0 +1,292 @@
+import fcntl
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+
+from flask import current_app
+
+
+# Cache of rendered page fragments. Entries are keyed by a version that the views bump
+# whenever they change a bucket, so stale entries are never read again and are evicted in
+# time. Versions are held by the cache backend rather than the database, so that a hit
+# does not touch the database at all.
+class PageCache(object):
+    def init_app(self, app):
+        max_entries = app.config["PAGE_CACHE_MAX_ENTRIES"]
+        if app.config["PAGE_CACHE_DIR"]:
+            backend = FileBackend(app.config["PAGE_CACHE_DIR"], max_entries)
+        else:
+            backend = MemoryBackend(max_entries)
+        app.extensions["page_cache"] = _CacheState(backend)
+
+    def bucket_key(self, bucket_id):
+        # Rows are rendered relative to today (overdue, "Tomorrow"), so the date is part
+        # of the key
+        backend = self._backend
+        version = backend.version(f"bucket:{bucket_id}")
+        return f"bucket:{bucket_id}:{backend.epoch}:{version}:{date.today()}"
+
+    def nav_key(self):
+        # Items become overdue as the date changes, which changes the counts shown
+        backend = self._backend
+        return f"nav:{backend.epoch}:{backend.version('nav')}:{date.today()}"
+
+    def bucket_validators(self, bucket_id):
+        # The ETag and Last-Modified time of a bucket's first page follow the same versions
+        # as its cache entries.
+        backend = self._backend
+        csrf_window, csrf_window_start = _csrf_window()
+        etag = _digest(f"{self.bucket_key(bucket_id)}:{self.nav_key()}:{csrf_window}")
+        start_of_today = datetime.combine(date.today(), datetime.min.time()).astimezone()
+        last_modified = max(
+            backend.changed_time(f"bucket:{bucket_id}"),
+            backend.changed_time("nav"),
+            start_of_today.timestamp(),
+            csrf_window_start,
+        )
+        return etag, datetime.fromtimestamp(last_modified, timezone.utc)
+
+    def get(self, key):
+        state = self._state
+        if not state.enabled:
+            return None
+        value = state.backend.get(key)
+        with state.lock:
+            if value is None:
+                state.misses += 1
+            else:
+                state.hits += 1
+        return value
+
+    def set(self, key, value):
+        state = self._state
+        if not state.enabled:
+            return
+        evicted = state.backend.set(key, value)
+        with state.lock:
+            state.evictions += evicted
+
+    def invalidate_bucket(self, *bucket_ids):
+        for bucket_id in set(bucket_ids):
+            self._backend.bump(f"bucket:{bucket_id}")
+        # Every page shows the open item counts of all buckets in the navigation bar
+        self.invalidate_nav()
+
+    def invalidate_nav(self):
+        self._backend.bump("nav")
+
+    def clear(self):
+        # Invalidates every entry, for when the database is replaced (e.g. manage.py create_db)
+        # and the ids of the buckets cached may be reused by others
+        self._backend.clear()
+
+    def stats(self):
+        state = self._state
+        return {
+            "backend": type(state.backend).__name__,
+            "entries": state.backend.size(),
+            "max_entries": state.backend.max_entries,
+            "hits": state.hits,
+            "misses": state.misses,
+            "evictions": state.evictions,
+        }
+
+    @property
+    def _state(self):
+        return current_app.extensions["page_cache"]
+
+    @property
+    def _backend(self):
+        return self._state.backend
+
+
+class _CacheState(object):
+    def __init__(self, backend):
+        self.backend = backend
+        self.enabled = backend.max_entries > 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+# Versions are only bumped in the process that changed the data, so this backend is only
+# suitable when a single process serves the app and changes its data (e.g. the unit tests).
+class MemoryBackend(object):
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._changed_times = {}
+        self._lock = threading.Lock()
+        self.epoch = uuid.uuid4().hex
+        self._started_time = time.time()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._changed_times.clear()
+            self.epoch = uuid.uuid4().hex
+            self._started_time = time.time()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def size(self):
+        return len(self._entries)
+
+    def version(self, name):
+        return self._versions.get(name, 0)
+
+    def changed_time(self, name):
+        return self._changed_times.get(name, self._started_time)
+
+    def bump(self, name):
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            self._changed_times[name] = time.time()
+
+
+# Shared by all processes using the same directory. Entries are evicted least recently used
+# first, going by file modification times, which are updated when an entry is read.
+class FileBackend(object):
+    def __init__(self, directory, max_entries):
+        self.max_entries = max_entries
+        self._entries_dir = os.path.join(directory, "entries")
+        self._versions_dir = os.path.join(directory, "versions")
+        os.makedirs(self._entries_dir, exist_ok=True)
+        os.makedirs(self._versions_dir, exist_ok=True)
+        self._epoch_path = os.path.join(directory, "epoch")
+        if not os.path.exists(self._epoch_path):
+            self._write(self._epoch_path, uuid.uuid4().hex.encode())
+
+    # Part of every key, so that a new epoch (see clear) invalidates the entries and versions
+    # of all processes using the directory
+    @property
+    def epoch(self):
+        with open(self._epoch_path) as epoch_file:
+            return epoch_file.read()
+
+    def clear(self):
+        self._write(self._epoch_path, uuid.uuid4().hex.encode())
+        for entry in os.scandir(self._entries_dir):
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass  # Evicted by another process
+
+    def get(self, key):
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as entry_file:
+                value = pickle.load(entry_file)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None  # Missing, or evicted whilst we were reading it
+        return value
+
+    def set(self, key, value):
+        self._write(self._entry_path(key), pickle.dumps(value))
+        return self._evict()
+
+    def size(self):
+        return sum(1 for entry in os.scandir(self._entries_dir) if entry.name.endswith(".entry"))
+
+    def version(self, name):
+        try:
+            with open(self._version_path(name), "rb") as version_file:
+                return int(version_file.read())
+        except FileNotFoundError:
+            return 0
+
+    def changed_time(self, name):
+        # Versions bumped before the epoch last changed were bumped before the cache was cleared
+        epoch_time = os.stat(self._epoch_path).st_mtime
+        try:
+            return max(os.stat(self._version_path(name)).st_mtime, epoch_time)
+        except FileNotFoundError:
+            return epoch_time
+
+    def bump(self, name):
+        path = self._version_path(name)
+        with open(f"{path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._write(path, str(self.version(name) + 1).encode())
+
+    def _write(self, path, data):
+        # Written to a temporary file and moved into place so readers never see part of it
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(path), suffix=".tmp", delete=False
+        ) as temporary_file:
+            temporary_file.write(data)
+        os.replace(temporary_file.name, path)
+
+    def _evict(self):
+        entries = [
+            entry for entry in os.scandir(self._entries_dir) if entry.name.endswith(".entry")
+        ]
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return 0
+        evicted = 0
+        for entry in sorted(entries, key=_modified_time)[:excess]:
+            try:
+                os.remove(entry.path)
+                evicted += 1
+            except FileNotFoundError:
+                pass  # Evicted by another process
+        return evicted
+
+    def _entry_path(self, key):
+        return os.path.join(self._entries_dir, f"{_digest(key)}.entry")
+
+    def _version_path(self, name):
+        return os.path.join(self._versions_dir, _digest(name))
+
+
+def _csrf_window():
+    # The page contains CSRF tokens, which expire WTF_CSRF_TIME_LIMIT seconds after they are
+    # issued. Browsers revalidate it into a new page every half of that time, so the tokens
+    # they keep using are never older than half of the limit.
+    config = current_app.config
+    time_limit = config.get("WTF_CSRF_TIME_LIMIT", 3600)
+    if not config.get("WTF_CSRF_ENABLED", True) or time_limit is None:
+        return 0, 0
+    window_length = time_limit / 2
+    window = int(time.time() // window_length)
+    return window, window * window_length
+
+
+def _modified_time(entry):
+    try:
+        return entry.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0  # Evicted by another process
+
+
+def _digest(key):
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+page_cache = PageCache()
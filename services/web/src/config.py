@@ -1,13 +1,66 @@
 import os
-
+import tempfile
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 
+def _engine_options(database_uri):
+    options = {
+        # Size of SQLAlchemy's cache of compiled statements, psycopg2 cannot reuse server side
+        # prepared statements so this is where repeated queries save their compilation
+        "query_cache_size": int(os.getenv("DB_QUERY_CACHE_SIZE", "500")),
+    }
+    if not database_uri.startswith("postgresql"):
+        return options  # SQLite uses its own pools, which take none of the options below
+    statement_timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    options.update(
+        {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+            # Replace connections before Postgres or anything in between drops them
+            "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            # Check connections are alive before use, e.g. after Postgres restarts
+            "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+            "connect_args": {
+                "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "10")),
+                # Default for every statement, views can change it with statement_timeout()
+                "options": f"-c statement_timeout={statement_timeout_ms}",
+            },
+        }
+    )
+    return options
+
+
 class Config(object):
     # SQLite fall back for unit testing
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite://")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
     STATIC_FOLDER = f"{os.getenv('APP_FOLDER')}/project/static"
     MEDIA_FOLDER = f"{os.getenv('APP_FOLDER')}/project/media"
     SECRET_KEY = os.getenv("SECRET_KEY", "hardcoded-key-for-dev")
+    # Number of open items rendered per page of a bucket
+    BUCKET_PAGE_SIZE = int(os.getenv("BUCKET_PAGE_SIZE", "100"))
+    # Largest number of items a single API request may read or change
+    API_MAX_BATCH_SIZE = int(os.getenv("API_MAX_BATCH_SIZE", "1000"))
+    # Rendered bucket pages and navigation bars to keep, 0 disables the cache
+    PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "512"))
+    # Directory of the cache shared by all processes on the host. The web processes and the
+    # manage.py commands that change items must share it, so that pages cached by one process
+    # are invalidated by the others. Set to "" to cache in the memory of each process, which
+    # is only right when a single process serves and changes everything.
+    PAGE_CACHE_DIR = os.getenv(
+        "PAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "my_stuff_page_cache")
+    )
+    # Directory of compiled templates shared by all processes, see manage.py
+    # precompile_templates; otherwise each process compiles the templates it renders
+    TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR")
+    # SQL statements taking at least this long are logged along with the endpoint
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+    # Items due within this many days are listed as due soon on the agenda
+    AGENDA_DUE_SOON_DAYS = int(os.getenv("AGENDA_DUE_SOON_DAYS", "7"))
+    # Number of search results on each page
+    SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "50"))
+    # Items completed more than this many days ago are moved to the archive by manage.py archive
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
@@ -1,10 +1,33 @@
-from datetime import date, datetime
-from humanize import naturaldate
+from collections import defaultdict, namedtuple
+from datetime import date, datetime, timedelta
+from functools import wraps
 
+from flask import g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+
+# The full text search tables on SQLite, which are not models (see SQLITE_SEARCH_DDL)
+SQLITE_SEARCH_TABLES = {
+    "item_search",
+    "item_search_config",
+    "item_search_data",
+    "item_search_docsize",
+    "item_search_idx",
+}
+
+
+def include_name(name, type_, parent_names):
+    # Keeps migrations away from tables that are not models
+    return not (type_ == "table" and name in SQLITE_SEARCH_TABLES)
+
 
 db = SQLAlchemy()
 
+BucketSummary = namedtuple(
+    "BucketSummary", ["id", "title", "open_count", "overdue_count", "flagged_count"]
+)
+Agenda = namedtuple("Agenda", ["overdue", "due_soon", "flagged"])
+
 
 class Bucket(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -12,43 +35,608 @@ class Bucket(db.Model):
     description = db.Column(db.Text, nullable=False)
     can_deactivate = db.Column(db.Boolean, default=True, nullable=False)
     deactivated_time = db.Column(db.DateTime, nullable=True)
+    # Counts of the bucket's open items, see _count_item_changes. Items due before
+    # overdue_counted_date are counted as overdue.
+    open_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    overdue_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    flagged_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    overdue_counted_date = db.Column(db.Date, nullable=False, default=date.today)
 
     @property
     def incomplete_items(self):
-        return list(
-            db.session.query(Item)
-            .filter_by(bucket_id=self.id)
-            .filter_by(completed_time=None)
-            .order_by("id")
-        )
+        return list(self.items.filter_by(completed_time=None).order_by(Item.rank, Item.id))
+
+    def open_items_page(self, page_size, after_id=None):
+        query = self.items.filter_by(completed_time=None)
+        if after_id is not None:
+            # Pages carry on from the (rank, id) of the last item on the previous page
+            after_rank = db.session.scalar(db.select(Item.rank).where(Item.id == after_id))
+            if after_rank is not None:
+                query = query.filter(db.tuple_(Item.rank, Item.id) > (after_rank, after_id))
+        # Fetch one extra row to find out whether there is another page
+        items = query.order_by(Item.rank, Item.id).limit(page_size + 1).all()
+        next_after_id = items[page_size - 1].id if len(items) > page_size else None
+        return items[:page_size], next_after_id
+
+    def history_page(self, page_size, before=None):
+        # Completed items, including archived ones, most recently completed first. before is
+        # the (completed_time, id) of the last item on the previous page.
+        queries = []
+        for model in (Item, ArchivedItem):
+            query = db.select(
+                model.id,
+                model.title,
+                model.description,
+                model.completed_time,
+                db.literal(model is ArchivedItem).label("archived"),
+            ).where(model.bucket_id == self.id, model.completed_time.isnot(None))
+            if before is not None:
+                query = query.where(db.tuple_(model.completed_time, model.id) < before)
+            queries.append(query)
+        history = db.union_all(*queries).subquery()
+        items = db.session.execute(
+            db.select(history)
+            .order_by(history.c.completed_time.desc(), history.c.id.desc())
+            .limit(page_size + 1)
+        ).all()
+        if len(items) > page_size:
+            last_item = items[page_size - 1]
+            next_before = (last_item.completed_time, last_item.id)
+        else:
+            next_before = None
+        return items[:page_size], next_before
 
     def __repr__(self):
         return f"<Bucket {self.id}: {self.title}>"
 
 
+# Gap between the ranks of items, see Item.rank
+RANK_STEP = 1024
+
+
 class Item(db.Model):
+    __table_args__ = (
+        db.Index("ix_item_bucket_id_completed_time", "bucket_id", "completed_time"),
+        db.Index(
+            "ix_item_open_bucket_id_rank",
+            "bucket_id",
+            "rank",
+            "id",
+            postgresql_where=db.text("completed_time IS NULL"),
+            sqlite_where=db.text("completed_time IS NULL"),
+        ),
+        db.Index(
+            "ix_item_open_due_date",
+            "due_date",
+            postgresql_where=db.text("completed_time IS NULL AND due_date IS NOT NULL"),
+            sqlite_where=db.text("completed_time IS NULL AND due_date IS NOT NULL"),
+        ),
+        db.Index(
+            "ix_item_open_flagged",
+            "bucket_id",
+            postgresql_where=db.text("completed_time IS NULL AND flagged"),
+            sqlite_where=db.text("completed_time IS NULL AND flagged"),
+        ),
+        db.Index("ix_item_updated_time", "updated_time"),
+        # Full text search on Postgres, SQLite has the item_search table below instead
+        db.Index(
+            "ix_item_search",
+            db.text("to_tsvector('english', title || ' ' || coalesce(description, ''))"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     bucket_id = db.Column(db.Integer, db.ForeignKey("bucket.id"), nullable=False)
-    bucket = db.relationship("Bucket", backref=db.backref("items", lazy=False))
+    bucket = db.relationship("Bucket", backref=db.backref("items", lazy="dynamic"))
     title = db.Column(db.String(128), nullable=False)
     description = db.Column(db.Text, nullable=True)
     created_time = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     due_date = db.Column(db.Date, nullable=True)
     completed_time = db.Column(db.DateTime, nullable=True)
     flagged = db.Column(db.Boolean, default=False, nullable=False)
+    # Set on every change, including bulk updates, for incremental exports
+    updated_time = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+    # Position of the item amongst the open items of its bucket, in order of rank then id.
+    # Ranks are RANK_STEP apart, leaving gaps to put an item between two others without
+    # changing any other item.
+    rank = db.Column(db.BigInteger, nullable=False, default=lambda context: _next_rank(context))
 
-    @property
-    def due_date_human(self):
-        if self.due_date is None:
-            return None
-        else:
-            return f"{naturaldate(self.due_date).title()}"
+    def __repr__(self):
+        return f"<Item {self.id}: {self.title}>"
 
-    @property
-    def is_overdue(self):
-        if self.due_date is None:
-            return False
-        return self.due_date < date.today()
+
+# Full text search of item titles and descriptions on SQLite, an FTS5 index of the item
+# table kept up to date by triggers, so all changes to items are searchable including bulk
+# ones. Created along with the item table, and by the migration adding search.
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS item_search USING fts5(title, description, "
+    "content='item', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS item_search_insert AFTER INSERT ON item BEGIN "
+    "INSERT INTO item_search (rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS item_search_delete AFTER DELETE ON item BEGIN "
+    "INSERT INTO item_search (item_search, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS item_search_update AFTER UPDATE OF title, description ON item "
+    "BEGIN INSERT INTO item_search (item_search, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO item_search (rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+]
+
+
+@event.listens_for(Item.__table__, "after_create")
+def _create_sqlite_search(target, connection, **kwargs):
+    if connection.dialect.name == "sqlite":
+        for statement in SQLITE_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Item.__table__, "before_drop")
+def _drop_sqlite_search(target, connection, **kwargs):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS item_search")
+
+
+# Items completed long ago, moved out of the item table by manage.py archive so that it only
+# holds the items in use. Ids are kept from the item table, and archived items are never
+# changed.
+class ArchivedItem(db.Model):
+    __table_args__ = (
+        db.Index("ix_archived_item_bucket_id_completed_time", "bucket_id", "completed_time", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    bucket_id = db.Column(db.Integer, db.ForeignKey("bucket.id"), nullable=False)
+    title = db.Column(db.String(128), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    created_time = db.Column(db.DateTime, nullable=False)
+    due_date = db.Column(db.Date, nullable=True)
+    completed_time = db.Column(db.DateTime, nullable=False)
+    flagged = db.Column(db.Boolean, nullable=False)
+    updated_time = db.Column(db.DateTime, nullable=False)
+    archived_time = db.Column(db.DateTime, nullable=False)
 
     def __repr__(self):
-        return f"<Item {self.id}: {self.title}>"
+        return f"<ArchivedItem {self.id}: {self.title}>"
+
+
+def bucket_summaries():
+    # Reads the counts kept on each bucket, so this is one scan of the bucket table. Items
+    # due yesterday are overdue today, so the overdue items of buckets not counted since
+    # before today are counted as they are read, until refresh_overdue_counts (run by
+    # manage.py recount_buckets --overdue) counts them again.
+    today = date.today()
+    overdue_count = db.case(
+        (
+            Bucket.overdue_counted_date < today,
+            _item_count(OPEN, Item.due_date.isnot(None), Item.due_date < today),
+        ),
+        else_=Bucket.overdue_count,
+    )
+    rows = db.session.execute(
+        db.select(
+            Bucket.id,
+            Bucket.title,
+            Bucket.open_count,
+            overdue_count,
+            Bucket.flagged_count,
+        ).order_by(Bucket.id)
+    ).all()
+    return [BucketSummary(*row) for row in rows]
+
+
+# Counted item columns, and the conditions of the open item indexes, which let the counts
+# and the agenda read only the items they need. SQLite compares booleans with 1, which it
+# does not match to the "flagged" condition of ix_item_open_flagged.
+COUNTED_COLUMNS = ("bucket_id", "completed_time", "flagged", "due_date")
+OPEN = Item.completed_time.is_(None)
+FLAGGED = db.literal_column("item.flagged", db.Boolean)
+
+
+def recount_buckets(bucket_ids=None):
+    # Counts the items of the given buckets, or all buckets, again. Used after changing
+    # items without the ORM (e.g. bulk updates), which _count_item_changes does not see.
+    if bucket_ids is not None and not bucket_ids:
+        return
+    today = date.today()
+    statement = db.update(Bucket).values(
+        open_count=_item_count(OPEN),
+        overdue_count=_item_count(OPEN, Item.due_date.isnot(None), Item.due_date < today),
+        flagged_count=_item_count(OPEN, FLAGGED),
+        overdue_counted_date=today,
+    )
+    if bucket_ids is not None:
+        statement = statement.where(Bucket.id.in_(bucket_ids))
+    db.session.execute(statement)
+
+
+def refresh_overdue_counts(today):
+    # Counts the overdue items of buckets not counted since before today again
+    db.session.execute(
+        db.update(Bucket)
+        .where(Bucket.overdue_counted_date < today)
+        .values(
+            overdue_count=_item_count(OPEN, Item.due_date.isnot(None), Item.due_date < today),
+            overdue_counted_date=today,
+        )
+    )
+
+
+def bucket_count_errors():
+    # Buckets whose counts do not match their items, as (bucket, [(count, kept, actual)])
+    counts = ["open_count", "overdue_count", "flagged_count"]
+    rows = db.session.execute(
+        db.select(
+            Bucket,
+            _item_count(OPEN),
+            _item_count(
+                OPEN, Item.due_date.isnot(None), Item.due_date < Bucket.overdue_counted_date
+            ),
+            _item_count(OPEN, FLAGGED),
+        ).order_by(Bucket.id)
+    ).all()
+    errors = []
+    for bucket, *actual_counts in rows:
+        wrong_counts = [
+            (count, getattr(bucket, count), actual)
+            for count, actual in zip(counts, actual_counts)
+            if getattr(bucket, count) != actual
+        ]
+        if wrong_counts:
+            errors.append((bucket, wrong_counts))
+    return errors
+
+
+def _item_count(*criteria):
+    return (
+        db.select(db.func.count(Item.id))
+        .where(Item.bucket_id == Bucket.id, *criteria)
+        .scalar_subquery()
+    )
+
+
+def move_items_to_bucket(item_ids, bucket):
+    # Moves the items to the bucket with one UPDATE, without loading the items or the items
+    # of either bucket, and moves their counts with them. Gives back the ids of the buckets
+    # that items were moved from.
+    moving = [Item.id.in_(item_ids), Item.bucket_id != bucket.id]
+    # The items are locked as they are counted, so that they cannot be changed (and their
+    # counts moved twice) before they are moved. Postgres cannot lock rows that are grouped,
+    # so they are locked by a subquery.
+    moved = (
+        db.select(
+            Item.bucket_id,
+            db.case((OPEN, 1), else_=0).label("open"),
+            db.case((db.and_(OPEN, FLAGGED), 1), else_=0).label("flagged"),
+            db.case((OPEN, Item.due_date)).label("open_due_date"),
+        )
+        .where(*moving)
+        .with_for_update()
+        .subquery()
+    )
+    moved_counts = db.session.execute(
+        db.select(
+            moved.c.bucket_id,
+            db.func.sum(moved.c.open),
+            _sum_where(moved.c.open_due_date < Bucket.overdue_counted_date),
+            db.func.sum(moved.c.flagged),
+            _sum_where(moved.c.open_due_date < bucket.overdue_counted_date),
+        )
+        .join(Bucket, Bucket.id == moved.c.bucket_id)
+        .group_by(moved.c.bucket_id)
+    ).all()
+    if not moved_counts:
+        return []
+    # Moved items go after the items already in the bucket
+    db.session.execute(
+        db.update(Item)
+        .where(*moving)
+        .values(bucket_id=bucket.id, rank=rank_after_last(bucket.id).scalar_subquery()),
+        execution_options={"synchronize_session": False},
+    )
+    for bucket_id, open_count, overdue_count, flagged_count, _ in moved_counts:
+        _add_to_counts(bucket_id, -open_count, -overdue_count, -flagged_count)
+    # Items overdue in the bucket they came from might not be in this bucket, if it was
+    # counted on a different day
+    _add_to_counts(
+        bucket.id,
+        sum(counts[1] for counts in moved_counts),
+        sum(counts[4] for counts in moved_counts),
+        sum(counts[3] for counts in moved_counts),
+    )
+    return [counts[0] for counts in moved_counts]
+
+
+def bulk_update_items(item_ids, values, *criteria):
+    # Changes the items matching the criteria to the values with one UPDATE, without the ORM,
+    # and changes the counts of their buckets by the difference. The values are constants,
+    # e.g. {"flagged": True}.
+    matching = [Item.id.in_(item_ids), *criteria]
+    connection = db.session.connection()
+    previous = _counted_values(connection, *matching)
+    if not previous:
+        return
+    db.session.execute(
+        db.update(Item).where(*matching).values(values),
+        execution_options={"synchronize_session": False},
+    )
+    changes = _count_changes()
+    for row in previous:
+        _add_counts(changes, row, -1)
+        changed = [values.get(column, value) for column, value in zip(COUNTED_COLUMNS, row)]
+        _add_counts(changes, changed, 1)
+    _apply_count_changes(connection, changes)
+
+
+def bulk_delete_items(item_ids):
+    # Deletes the items with one DELETE, without the ORM, taking them off the counts of their
+    # buckets
+    connection = db.session.connection()
+    previous = _counted_values(connection, Item.id.in_(item_ids))
+    if not previous:
+        return
+    db.session.execute(
+        db.delete(Item).where(Item.id.in_(item_ids)),
+        execution_options={"synchronize_session": False},
+    )
+    changes = _count_changes()
+    for row in previous:
+        _add_counts(changes, row, -1)
+    _apply_count_changes(connection, changes)
+
+
+def count_new_items(rows):
+    # Adds items inserted without the ORM (e.g. by COPY), given as dicts of their columns, to
+    # the counts of their buckets
+    changes = _count_changes()
+    for row in rows:
+        _add_counts(changes, [row[column] for column in COUNTED_COLUMNS], 1)
+    _apply_count_changes(db.session.connection(), changes)
+
+
+def _sum_where(*criteria):
+    return db.func.sum(db.case((db.and_(*criteria), 1), else_=0))
+
+
+def _add_to_counts(bucket_id, open_count, overdue_count, flagged_count):
+    db.session.execute(
+        db.update(Bucket)
+        .where(Bucket.id == bucket_id)
+        .values(
+            open_count=Bucket.open_count + open_count,
+            overdue_count=Bucket.overdue_count + overdue_count,
+            flagged_count=Bucket.flagged_count + flagged_count,
+        ),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def rank_after_last(bucket_id):
+    # Query of the rank that puts an item after the open items of the bucket
+    return db.select(db.func.coalesce(db.func.max(Item.rank), 0) + RANK_STEP).where(
+        Item.bucket_id == bucket_id, OPEN
+    )
+
+
+def _next_rank(context):
+    # New items go after the open items of their bucket
+    bucket_id = context.get_current_parameters()["bucket_id"]
+    return context.connection.scalar(rank_after_last(bucket_id))
+
+
+def place_item(item, after_item=None):
+    # Puts the open item after another open item of its bucket, or first, by changing its
+    # rank alone. The bucket's open items are ranked again when there is no gap between the
+    # two items it goes between.
+    others = db.select(Item.rank).where(Item.bucket_id == item.bucket_id, OPEN, Item.id != item.id)
+    if after_item is not None:
+        others = others.where(db.tuple_(Item.rank, Item.id) > (after_item.rank, after_item.id))
+    lower = after_item.rank if after_item is not None else None
+    upper = db.session.scalar(others.order_by(Item.rank, Item.id).limit(1))
+    if lower is not None and upper is not None and upper - lower < 2:
+        rank_open_items(item.bucket_id)
+        db.session.expire(item, ["rank"])
+        db.session.expire(after_item, ["rank"])
+        return place_item(item, after_item)
+    if upper is None:
+        item.rank = (lower or 0) + RANK_STEP
+    elif lower is None:
+        item.rank = upper - RANK_STEP
+    else:
+        item.rank = (lower + upper) // 2
+
+
+def move_item_up(item):
+    previous_item = adjacent_item(item, before=True)
+    if previous_item is not None:
+        place_item(item, adjacent_item(previous_item, before=True))
+
+
+def move_item_down(item):
+    next_item = adjacent_item(item, before=False)
+    if next_item is not None:
+        place_item(item, next_item)
+
+
+def adjacent_item(item, before):
+    # The open item of the same bucket just before or after the item
+    position = db.tuple_(Item.rank, Item.id)
+    query = db.select(Item).where(Item.bucket_id == item.bucket_id, OPEN)
+    if before:
+        query = query.where(position < (item.rank, item.id))
+        query = query.order_by(Item.rank.desc(), Item.id.desc())
+    else:
+        query = query.where(position > (item.rank, item.id)).order_by(Item.rank, Item.id)
+    return db.session.scalars(query.limit(1)).first()
+
+
+def rank_open_items(bucket_id):
+    # Spreads the ranks of the bucket's open items RANK_STEP apart again, keeping their order
+    # and leaving updated_time alone as their order has not changed
+    ranked = (
+        db.select(
+            Item.id,
+            (db.func.row_number().over(order_by=(Item.rank, Item.id)) * RANK_STEP).label("rank"),
+        )
+        .where(Item.bucket_id == bucket_id, OPEN)
+        .subquery()
+    )
+    db.session.execute(
+        db.update(Item)
+        .where(Item.id == ranked.c.id)
+        .values(rank=ranked.c.rank, updated_time=Item.updated_time),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def crowded_buckets(min_gap):
+    # Ids of buckets with open items whose ranks are less than min_gap apart
+    gaps = (
+        db.select(
+            Item.bucket_id,
+            (
+                Item.rank
+                - db.func.lag(Item.rank).over(
+                    partition_by=Item.bucket_id, order_by=(Item.rank, Item.id)
+                )
+            ).label("gap"),
+        )
+        .where(OPEN)
+        .subquery()
+    )
+    return db.session.scalars(
+        db.select(gaps.c.bucket_id).where(gaps.c.gap < min_gap).distinct()
+    ).all()
+
+
+@event.listens_for(db.session, "before_flush")
+def _uncount_changed_items(session, flush_context, instances):
+    # The counts of changed and deleted items are taken off their buckets as they are in the
+    # database before the flush, as attribute history lacks values that were not loaded
+    item_ids = {
+        item.id for item in session.dirty if isinstance(item, Item) and session.is_modified(item)
+    }
+    item_ids.update(item.id for item in session.deleted if isinstance(item, Item))
+    # Set on every flush, so nothing is left from a flush that failed
+    session.info["uncounted_items"] = []
+    if item_ids:
+        session.info["uncounted_items"] = _counted_values(
+            session.connection(), Item.id.in_(item_ids)
+        )
+
+
+@event.listens_for(db.session, "after_flush")
+def _count_item_changes(session, flush_context):
+    # Adjusts the counts of the buckets of items added, changed or deleted through the ORM in
+    # the same transaction. The counts are changed in the database (count = count + 1) so
+    # that concurrent changes are not lost, and overdue items are counted relative to each
+    # bucket's overdue_counted_date.
+    changes = _count_changes()
+    for values in session.info.pop("uncounted_items", []):
+        _add_counts(changes, values, -1)
+    changed_items = [item for item in session.dirty if session.is_modified(item)]
+    for item in list(session.new) + changed_items:
+        if isinstance(item, Item):
+            _add_counts(changes, [getattr(item, column) for column in COUNTED_COLUMNS], 1)
+    bucket_ids = _apply_count_changes(session.connection(), changes)
+    session.info.setdefault("recounted_buckets", set()).update(bucket_ids)
+
+
+@event.listens_for(db.session, "after_flush_postexec")
+def _expire_bucket_counts(session, flush_context):
+    # Buckets already loaded read their counts again when next used
+    bucket_ids = session.info.pop("recounted_buckets", set())
+    for bucket in list(session.identity_map.values()):
+        if isinstance(bucket, Bucket) and bucket.id in bucket_ids:
+            session.expire(bucket, ["open_count", "overdue_count", "flagged_count"])
+
+
+def _counted_values(connection, *criteria):
+    # The counted columns of the items, which are locked until the transaction ends so that
+    # a concurrent change of the same items waits and then reads what this one changed them
+    # to, rather than both taking the same values off the counts
+    columns = [getattr(Item, column) for column in COUNTED_COLUMNS]
+    return connection.execute(
+        db.select(*columns).where(*criteria).order_by(Item.id).with_for_update()
+    ).all()
+
+
+def _count_changes():
+    return defaultdict(lambda: {"open": 0, "flagged": 0, "due_dates": defaultdict(int)})
+
+
+def _apply_count_changes(connection, changes):
+    # Gives back the ids of the buckets whose counts changed
+    bucket_ids = set()
+    for bucket_id, change in changes.items():
+        due_dates = {due_date: sign for due_date, sign in change["due_dates"].items() if sign}
+        if not change["open"] and not change["flagged"] and not due_dates:
+            continue
+        overdue_count = Bucket.overdue_count
+        for due_date, sign in due_dates.items():
+            overdue_count += db.case((Bucket.overdue_counted_date > due_date, sign), else_=0)
+        connection.execute(
+            db.update(Bucket)
+            .where(Bucket.id == bucket_id)
+            .values(
+                open_count=Bucket.open_count + change["open"],
+                overdue_count=overdue_count,
+                flagged_count=Bucket.flagged_count + change["flagged"],
+            )
+        )
+        bucket_ids.add(bucket_id)
+    return bucket_ids
+
+
+def _add_counts(changes, values, sign):
+    bucket_id, completed_time, flagged, due_date = values
+    if bucket_id is None or completed_time is not None:
+        return
+    change = changes[bucket_id]
+    change["open"] += sign
+    change["flagged"] += sign if flagged else 0
+    if due_date is not None:
+        change["due_dates"][due_date] += sign
+
+
+def agenda(today, due_soon_days, limit):
+    # Open items needing attention across all buckets, as lists of (item, bucket title). Each
+    # list is one range query on an open item index joined to bucket, reading no more than
+    # limit items however many buckets there are. Flagged items already due soon or overdue
+    # are only listed as such.
+    due_soon_end = today + timedelta(days=due_soon_days)
+    open_items = db.session.query(Item, Bucket.title).join(Bucket).filter(OPEN)
+    dated = open_items.filter(Item.due_date.isnot(None)).order_by(Item.due_date, Item.id)
+    overdue = dated.filter(Item.due_date < today)
+    due_soon = dated.filter(Item.due_date >= today, Item.due_date <= due_soon_end)
+    flagged = open_items.filter(
+        FLAGGED, db.or_(Item.due_date.is_(None), Item.due_date > due_soon_end)
+    ).order_by(Item.bucket_id, Item.id)
+    return Agenda(*(query.limit(limit).all() for query in (overdue, due_soon, flagged)))
+
+
+def statement_timeout(milliseconds):
+    # Gives the statements run by a view a different timeout to DB_STATEMENT_TIMEOUT_MS,
+    # e.g. longer for exports, 0 for none. Only applies to Postgres.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.statement_timeout_ms = milliseconds
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@event.listens_for(db.session, "after_begin")
+def _set_statement_timeout(session, transaction, connection):
+    timeout = g.get("statement_timeout_ms") if has_request_context() else None
+    if timeout is not None and connection.dialect.name == "postgresql":
+        # SET LOCAL lasts until the end of the transaction, so the connection goes back to the
+        # pool with its default timeout
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
@@ -0,0 +1,43 @@
+from datetime import date
+
+from flask import g
+from humanize import naturaldate
+
+
+# Works out how due dates are shown once per request. A page has many items but only a
+# handful of distinct due dates, so labels are worked out once per date rather than once
+# per item.
+class DateLabels(object):
+    def __init__(self):
+        self.today = date.today()
+        self._labels = {}
+
+    def label(self, due_date):
+        if due_date is None:
+            return None
+        label = self._labels.get(due_date)
+        if label is None:
+            label = self._labels[due_date] = naturaldate(due_date).title()
+        return label
+
+    def is_overdue(self, due_date):
+        return due_date is not None and due_date < self.today
+
+
+def date_labels():
+    if "date_labels" not in g:
+        g.date_labels = DateLabels()
+    return g.date_labels
+
+
+def due_date_label(due_date):
+    return date_labels().label(due_date)
+
+
+def is_overdue(due_date):
+    return date_labels().is_overdue(due_date)
+
+
+def init_app(app):
+    app.add_template_filter(due_date_label)
+    app.add_template_filter(is_overdue)
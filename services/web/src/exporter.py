@@ -0,0 +1,99 @@
+import csv
+import json
+from datetime import date, datetime
+
+from src.database import db, ArchivedItem, Bucket, Item
+
+# Buckets and items share these columns in CSV exports, which can be imported again
+CSV_COLUMNS = [
+    "type",
+    "id",
+    "bucket",
+    "title",
+    "description",
+    "created_time",
+    "due_date",
+    "completed_time",
+    "flagged",
+    "updated_time",
+]
+MIMETYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+# Exports buckets followed by their items, open, completed and archived, as JSON lines or
+# CSV. The export is produced in chunks of chunk_size records read through a server side
+# cursor on Postgres, so memory use stays the same however many items there are. Items can
+# be filtered by bucket, when they were completed (which leaves out open items) and when
+# they last changed.
+def export_records(
+    file_format,
+    bucket_id=None,
+    completed_after=None,
+    completed_before=None,
+    updated_since=None,
+    chunk_size=1000,
+):
+    write = _csv_line if file_format == "csv" else _json_line
+    if file_format == "csv":
+        yield _csv_line(dict(zip(CSV_COLUMNS, CSV_COLUMNS)))
+
+    buckets = db.select(Bucket.id, Bucket.title, Bucket.description).order_by(Bucket.id)
+    if bucket_id is not None:
+        buckets = buckets.where(Bucket.id == bucket_id)
+    for chunk in _chunks(buckets, chunk_size):
+        yield "".join(write({"type": "bucket", **row._asdict()}) for row in chunk)
+
+    # Archived items are exported as items, as they are when imported again
+    for model in (Item, ArchivedItem):
+        items = (
+            db.select(
+                model.id,
+                Bucket.title.label("bucket"),
+                model.title,
+                model.description,
+                model.created_time,
+                model.due_date,
+                model.completed_time,
+                model.flagged,
+                model.updated_time,
+            )
+            .join(Bucket)
+            .order_by(model.id)
+        )
+        if bucket_id is not None:
+            items = items.where(model.bucket_id == bucket_id)
+        if completed_after is not None:
+            items = items.where(model.completed_time >= completed_after)
+        if completed_before is not None:
+            items = items.where(model.completed_time < completed_before)
+        if updated_since is not None:
+            items = items.where(model.updated_time >= updated_since)
+        for chunk in _chunks(items, chunk_size):
+            yield "".join(write({"type": "item", **row._asdict()}) for row in chunk)
+
+
+def _chunks(query, chunk_size):
+    # yield_per streams the results from a server side cursor on Postgres
+    return db.session.execute(query.execution_options(yield_per=chunk_size)).partitions()
+
+
+def _json_line(record):
+    return json.dumps(record, default=_isoformat) + "\n"
+
+
+def _csv_line(record):
+    values = [record.get(column) for column in CSV_COLUMNS]
+    writer = csv.writer(_Line())
+    return writer.writerow(
+        [_isoformat(value) if isinstance(value, (date, datetime)) else value for value in values]
+    )
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+# Hands back what the csv module writes to it, so each row can be yielded as a string
+class _Line(object):
+    def write(self, value):
+        return value
@@ -1,22 +1,46 @@
+from blinker import Namespace
 from flask_wtf import FlaskForm
-from wtforms import BooleanField, DateField, StringField, SubmitField, TextAreaField
+from wtforms import (
+    BooleanField,
+    DateField,
+    SelectField,
+    SelectMultipleField,
+    StringField,
+    SubmitField,
+    TextAreaField,
+)
 from wtforms.validators import DataRequired, Length, Optional, ValidationError
 
-from src.database import Bucket
+from src.database import db, Bucket
+
+BUCKET_TITLE_NOT_UNIQUE = "Bucket title must be unique."
+
+# Sent with the form whenever a submitted form fails validation
+validation_failed = Namespace().signal("validation-failed")
 
 
 def bucket_title_is_unique(form, field):
-    if field.object_data is not None:
-        all_bucket_titles = {
-            bucket.title for bucket in Bucket.query.all() if bucket.title != field.object_data
-        }
-    else:
-        all_bucket_titles = {bucket.title for bucket in Bucket.query.all()}
-    if field.data in all_bucket_titles:
-        raise ValidationError("Bucket title must be unique.")
+    if field.data == field.object_data:
+        return  # Bucket being edited keeps its own title
+    if _bucket_title_exists(field.data):
+        raise ValidationError(BUCKET_TITLE_NOT_UNIQUE)
+
+
+def _bucket_title_exists(title):
+    return db.session.query(
+        db.session.query(Bucket.id).filter(Bucket.title == title).exists()
+    ).scalar()
+
 
+class BaseForm(FlaskForm):
+    def validate(self, extra_validators=None):
+        valid = super().validate(extra_validators=extra_validators)
+        if not valid:
+            validation_failed.send(self)
+        return valid
 
-class BucketFormMixin(FlaskForm):
+
+class BucketFormMixin(BaseForm):
     title = StringField(
         "Title",
         validators=[
@@ -31,15 +55,15 @@ class BucketFormMixin(FlaskForm):
     )
 
 
-class CreateBucketForm(BucketFormMixin, FlaskForm):
+class CreateBucketForm(BucketFormMixin, BaseForm):
     submit = SubmitField("Create bucket")
 
 
-class UpdateBucketForm(BucketFormMixin, FlaskForm):
+class UpdateBucketForm(BucketFormMixin, BaseForm):
     submit = SubmitField("Update bucket")
 
 
-class QuickCreateItemForm(FlaskForm):
+class QuickCreateItemForm(BaseForm):
     title = StringField(
         "Title",
         validators=[
@@ -68,9 +92,22 @@ class ItemFormMixin:
     flagged = BooleanField("Flagged?", default=False)
 
 
-class CreateItemForm(ItemFormMixin, FlaskForm):
+class CreateItemForm(ItemFormMixin, BaseForm):
     submit = SubmitField("Create item")
 
 
-class UpdateItemForm(ItemFormMixin, FlaskForm):
+class UpdateItemForm(ItemFormMixin, BaseForm):
+    # Choices are the buckets, set by the view
+    bucket_id = SelectField("Bucket", coerce=int)
     submit = SubmitField("Update item")
+
+
+class MoveItemsForm(BaseForm):
+    # The item checkboxes are in the rows of the bucket page, outside of the form
+    item_ids = SelectMultipleField(
+        coerce=int,
+        validate_choice=False,
+        validators=[DataRequired(message="Select the items to move.")],
+    )
+    bucket_id = SelectField("Move to", coerce=int)
+    submit = SubmitField("Move selected")
@@ -0,0 +1,201 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from itertools import islice
+
+from src.cache import page_cache
+from src.database import db, count_new_items, rank_after_last, Bucket, Item, RANK_STEP
+
+# Item columns in the order they are sent to Postgres by COPY
+COLUMNS = [
+    "bucket_id",
+    "title",
+    "description",
+    "created_time",
+    "due_date",
+    "completed_time",
+    "flagged",
+    "updated_time",
+    "rank",
+]
+TRUE_VALUES = {"1", "t", "true", "y", "yes"}
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+# Imports items from a CSV file with a header row, or a file of JSON objects one per line.
+# Each record has a title and optionally a bucket title (defaulting to the Inbox, buckets
+# that do not exist are created), description, created_time, due_date, completed_time and
+# flagged. Records with a type of "bucket", as written by an export, create the bucket with
+# that title and description if it does not exist yet. Records are read and inserted a
+# batch at a time, so memory use does not grow with the size of the file. After each batch
+# is committed the number of records done is saved to a checkpoint file next to the
+# source, and an import that stopped part way through carries on from there when run
+# again.
+def import_items(path, file_format, batch_size=10000, progress=None):
+    checkpoint = _Checkpoint(f"{path}.checkpoint")
+    done = checkpoint.load()
+    buckets = _BucketLookup()
+    now = datetime.utcnow()
+    with open(path, newline="") as source:
+        records = islice(_read(source, file_format), done, None)
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            try:
+                rows = []
+                for number, record in batch:
+                    if record.get("type") == "bucket":
+                        _bucket(number, record, buckets)
+                    else:
+                        rows.append(_row(number, record, buckets, now))
+                if rows:
+                    _insert(rows)
+                    count_new_items(rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            done += len(batch)
+            # Records committed just before a crash, without their checkpoint being saved,
+            # are imported again when the import carries on
+            checkpoint.save(done)
+            page_cache.invalidate_bucket(*{row["bucket_id"] for row in rows})
+            if progress:
+                progress(done)
+    checkpoint.remove()
+    return done
+
+
+def _read(source, file_format):
+    if file_format == "csv":
+        yield from enumerate(csv.DictReader(source), start=1)
+        return
+    number = 0
+    for line in source:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise InvalidRecord(f"Record {number}: {error}")
+        if not isinstance(record, dict):
+            raise InvalidRecord(f"Record {number}: not a JSON object")
+        yield number, record
+
+
+def _row(number, record, buckets, now):
+    try:
+        title = _text(record.get("title"))
+        if not title:
+            raise ValueError("title is required")
+        if len(title) > Item.title.type.length:
+            raise ValueError(f"title is longer than {Item.title.type.length} characters")
+        bucket_id = buckets.id_for(_text(record.get("bucket")) or "Inbox")
+        return {
+            "bucket_id": bucket_id,
+            "title": title,
+            "description": _text(record.get("description")) or None,
+            "created_time": _datetime(record.get("created_time")) or now,
+            "due_date": date.fromisoformat(record["due_date"]) if record.get("due_date") else None,
+            "completed_time": _datetime(record.get("completed_time")),
+            "flagged": _boolean(record.get("flagged")),
+            "updated_time": now,
+            "rank": buckets.next_rank(bucket_id),
+        }
+    except (TypeError, ValueError) as error:
+        raise InvalidRecord(f"Record {number}: {error}")
+
+
+def _bucket(number, record, buckets):
+    try:
+        title = _text(record.get("title"))
+        if not title:
+            raise ValueError("title is required")
+        buckets.id_for(title, description=_text(record.get("description")) or "")
+    except (TypeError, ValueError) as error:
+        raise InvalidRecord(f"Record {number}: {error}")
+
+
+def _insert(rows):
+    connection = db.session.connection()
+    if connection.dialect.name != "postgresql":
+        connection.execute(db.insert(Item), rows)
+        return
+    # COPY is much faster than INSERT for large batches. In CSV format an unquoted empty
+    # value is NULL, which is how the csv module writes None.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in COLUMNS])
+    buffer.seek(0)
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY item ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _text(value):
+    return str(value).strip() if value is not None else None
+
+
+def _datetime(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _boolean(value):
+    if isinstance(value, bool) or value is None:
+        return bool(value)
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+# Bucket ids by title, loaded once and added to as buckets are created by the import, and
+# the rank of the last item imported into each bucket so imported items keep their order
+class _BucketLookup(object):
+    def __init__(self):
+        self._ids = dict(db.session.query(Bucket.title, Bucket.id))
+        self._ranks = {}
+
+    def id_for(self, title, description="Imported items"):
+        if title not in self._ids:
+            if len(title) > Bucket.title.type.length:
+                raise ValueError(f"bucket is longer than {Bucket.title.type.length} characters")
+            bucket = Bucket(title=title, description=description)
+            db.session.add(bucket)
+            db.session.flush()
+            self._ids[title] = bucket.id
+        return self._ids[title]
+
+    def next_rank(self, bucket_id):
+        if bucket_id in self._ranks:
+            self._ranks[bucket_id] += RANK_STEP
+        else:
+            self._ranks[bucket_id] = db.session.scalar(rank_after_last(bucket_id))
+        return self._ranks[bucket_id]
+
+
+class _Checkpoint(object):
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path) as checkpoint_file:
+                return json.load(checkpoint_file)["records"]
+        except FileNotFoundError:
+            return 0
+
+    def save(self, records):
+        # Written to a temporary file and moved into place so it is never left half written
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump({"records": records}, checkpoint_file)
+        os.replace(temporary_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
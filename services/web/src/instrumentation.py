@@ -0,0 +1,98 @@
+import json
+import logging
+import time
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+from src.database import db
+
+logger = logging.getLogger(__name__)
+
+
+# Records the number of SQL queries, time spent in SQL and time spent rendering templates
+# for each request. In debug mode these are sent back as response headers, otherwise they
+# are logged as one JSON line per request. Queries slower than SLOW_QUERY_THRESHOLD_MS are
+# logged along with the endpoint that made them.
+def init_app(app):
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        endpoint = None
+        if has_request_context():
+            g.sql_queries = g.get("sql_queries", 0) + 1
+            g.sql_time = g.get("sql_time", 0) + elapsed
+            endpoint = request.endpoint
+        if elapsed * 1000 >= app.config["SLOW_QUERY_THRESHOLD_MS"]:
+            _log(
+                logging.WARNING,
+                event="slow_query",
+                endpoint=endpoint,
+                duration_ms=_ms(elapsed),
+                statement=statement,
+            )
+
+    @before_render_template.connect_via(app)
+    def before_render(sender, template, context, **extra):
+        # Templates can render other templates (e.g. the navigation bar), so only the
+        # outermost render is timed
+        g.setdefault("template_starts", []).append(time.perf_counter())
+
+    @template_rendered.connect_via(app)
+    def after_render(sender, template, context, **extra):
+        started = g.template_starts.pop()
+        if not g.template_starts:
+            g.template_time = g.get("template_time", 0) + time.perf_counter() - started
+
+    @app.before_request
+    def start_request():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def finish_request(response):
+        sql_queries = g.get("sql_queries", 0)
+        sql_time = g.get("sql_time", 0)
+        template_time = g.get("template_time", 0)
+        if app.debug:
+            response.headers["X-SQL-Queries"] = str(sql_queries)
+            response.headers["X-SQL-Time-Ms"] = str(_ms(sql_time))
+            response.headers["X-Template-Time-Ms"] = str(_ms(template_time))
+        else:
+            _log(
+                logging.INFO,
+                event="request",
+                method=request.method,
+                path=request.path,
+                endpoint=request.endpoint,
+                status=response.status_code,
+                duration_ms=_ms(time.perf_counter() - g.request_started),
+                sql_queries=sql_queries,
+                sql_ms=_ms(sql_time),
+                template_ms=_ms(template_time),
+            )
+        return response
+
+    # Kept on the app so the listeners are not garbage collected before the app
+    app.extensions["instrumentation"] = [before_render, after_render]
+
+
+def _log(level, **fields):
+    logger.log(level, json.dumps(fields))
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
@@ -0,0 +1,90 @@
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (
+    CollectorRegistry,
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    generate_latest,
+    Histogram,
+    multiprocess,
+    REGISTRY,
+)
+
+from src.database import db
+from src.forms import validation_failed
+
+# When served by several gunicorn workers, PROMETHEUS_MULTIPROC_DIR must be set to a
+# directory shared by the workers (and emptied before they start). Each worker then writes
+# its metrics there, and /metrics aggregates them across all workers.
+REQUEST_DURATION = Histogram(
+    "my_stuff_request_duration_seconds",
+    "Time taken to handle a request.",
+    ["route", "method", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "my_stuff_requests_in_flight",
+    "Requests currently being handled.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "my_stuff_db_pool_checked_out",
+    "Database connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "my_stuff_db_pool_overflow",
+    "Database connections currently open beyond the pool size.",
+    multiprocess_mode="livesum",
+)
+FORM_VALIDATION_FAILURES = Counter(
+    "my_stuff_form_validation_failures",
+    "Submitted forms that failed validation.",
+    ["form"],
+)
+
+
+def init_app(app):
+    @app.before_request
+    def start_request():
+        g.metrics_started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def observe_request(response):
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_DURATION.labels(route, request.method, response.status_code).observe(
+            time.perf_counter() - g.metrics_started
+        )
+        return response
+
+    @app.teardown_request
+    def finish_request(exception=None):
+        REQUESTS_IN_FLIGHT.dec()
+        _observe_pool()
+
+    app.add_url_rule("/metrics", "metrics", metrics)
+
+
+def metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), 200, {"Content-Type": CONTENT_TYPE_LATEST}
+
+
+def _observe_pool():
+    pool = db.engine.pool
+    # Not every pool keeps these counts, e.g. the static pool used for in memory SQLite
+    if hasattr(pool, "checkedout"):
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+
+@validation_failed.connect
+def _count_validation_failure(form):
+    FORM_VALIDATION_FAILURES.labels(type(form).__name__).inc()
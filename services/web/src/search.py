@@ -0,0 +1,45 @@
+from src.database import db, Bucket, Item
+
+# Must be the expression of the ix_item_search index for Postgres to use it
+POSTGRES_DOCUMENT = db.literal_column(
+    "to_tsvector('english', item.title || ' ' || coalesce(item.description, ''))"
+)
+SQLITE_SEARCH = db.table("item_search", db.column("rowid"), db.column("rank"))
+
+
+# Items with all of the words searched for in their title or description, whether open or
+# completed, best matches first. Gives back a page of (item, bucket title) pairs, and
+# whether there is another page.
+def search_items(text, page_size, page=1):
+    words = text.split()
+    if not words:
+        return [], False
+    query = db.session.query(Item, Bucket.title).join(Bucket)
+    # Fetch one extra row to find out whether there is another page
+    offset, limit = (page - 1) * page_size, page_size + 1
+    if db.engine.dialect.name == "postgresql":
+        ts_query = db.func.plainto_tsquery("english", " ".join(words))
+        query = (
+            query.filter(POSTGRES_DOCUMENT.op("@@")(ts_query))
+            .order_by(db.func.ts_rank(POSTGRES_DOCUMENT, ts_query).desc(), Item.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+    else:
+        # Each word is quoted so that characters with a meaning in FTS5 queries are
+        # searched for like any other
+        match = " ".join('"' + word.replace('"', '""') + '"' for word in words)
+        # Ranked within the search table before joining, which only has to join the page
+        matches = (
+            db.select(SQLITE_SEARCH.c.rowid, SQLITE_SEARCH.c.rank)
+            .where(db.text("item_search MATCH :match").bindparams(match=match))
+            .order_by(SQLITE_SEARCH.c.rank, SQLITE_SEARCH.c.rowid.desc())
+            .offset(offset)
+            .limit(limit)
+            .subquery()
+        )
+        query = query.join(matches, matches.c.rowid == Item.id).order_by(
+            matches.c.rank, Item.id.desc()
+        )
+    results = query.all()
+    return results[:page_size], len(results) > page_size
@@ -1,15 +1,32 @@
 from datetime import date, datetime, timedelta
 
-from flask import abort, Blueprint, redirect, render_template
+from flask import abort, Blueprint, current_app, make_response, redirect, render_template, request
+from markupsafe import Markup
+from sqlalchemy.exc import IntegrityError
+from werkzeug.http import is_resource_modified
 
-from src.database import db, Bucket, Item
+from src.cache import page_cache
+from src.database import (
+    db,
+    agenda,
+    bucket_summaries,
+    move_item_down,
+    move_item_up,
+    move_items_to_bucket,
+    Bucket,
+    Item,
+)
+from src.dates import date_labels
 from src.forms import (
+    BUCKET_TITLE_NOT_UNIQUE,
     CreateBucketForm,
     CreateItemForm,
+    MoveItemsForm,
     QuickCreateItemForm,
     UpdateBucketForm,
     UpdateItemForm,
 )
+from src.search import search_items
 
 bp = Blueprint("main", __name__)
 
@@ -22,25 +39,119 @@ def home():
     return redirect(f"/bucket/{inbox.id}/")
 
 
-@bp.route("/bucket/<bucket_id>/", methods=["GET", "POST"])
+@bp.route("/bucket/<int:bucket_id>/", methods=["GET", "POST"])
 def bucket(bucket_id):
-    bucket = _get_bucket(bucket_id)
+    # Cached pages and validators are kept by bucket id, so are only used once the bucket is
+    # known to exist
+    if bucket_id not in _bucket_ids():
+        abort(404)
+    conditional = request.method == "GET" and "after" not in request.args
+    if conditional:
+        etag, last_modified = page_cache.bucket_validators(bucket_id)
+        if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            return _with_validators(current_app.response_class(status=304), etag, last_modified)
     form = QuickCreateItemForm()
     if form.validate_on_submit():
+        bucket = _get_bucket(bucket_id)
         item = Item(title=form.title.data)
         bucket.items.append(item)
         db.session.add(bucket)
         db.session.commit()
-    all_buckets = Bucket.query.order_by("id")
+        page_cache.invalidate_bucket(bucket.id)
+    page = _bucket_page(bucket_id)
+    response = make_response(
+        render_template(
+            "bucket.html",
+            title=page["title"],
+            bucket=page,
+            form=form,
+            move_form=MoveItemsForm(prefix="move"),
+        )
+    )
+    if conditional:
+        _with_validators(response, etag, last_modified)
+    return response
+
+
+@bp.route("/bucket/<int:bucket_id>/items/")
+def bucket_items(bucket_id):
+    bucket = _get_bucket(bucket_id)
+    items, next_after_id = _open_items_page(bucket)
     return render_template(
-        "bucket.html",
-        title=bucket.title,
+        "_item_rows.html",
         bucket=bucket,
-        all_buckets=all_buckets,
-        form=form,
+        items=items,
+        next_after_id=next_after_id,
+    )
+
+
+@bp.route("/bucket/<int:bucket_id>/history/")
+def bucket_history(bucket_id):
+    bucket = _get_bucket(bucket_id)
+    items, next_before = bucket.history_page(
+        current_app.config["BUCKET_PAGE_SIZE"], before=_history_cursor()
+    )
+    return render_template(
+        "history.html",
+        title=f"History of {bucket.title}",
+        bucket=bucket,
+        items=items,
+        next_before=f"{next_before[0].isoformat()},{next_before[1]}" if next_before else None,
+    )
+
+
+@bp.route("/agenda/")
+def agenda_page():
+    return render_template(
+        "agenda.html",
+        title="Agenda",
+        agenda=agenda(
+            date_labels().today,
+            current_app.config["AGENDA_DUE_SOON_DAYS"],
+            current_app.config["BUCKET_PAGE_SIZE"],
+        ),
     )
 
 
+@bp.route("/search/")
+def search():
+    text = request.args.get("q", "")
+    page = max(request.args.get("page", 1, type=int), 1)
+    results, has_next_page = search_items(text, current_app.config["SEARCH_PAGE_SIZE"], page=page)
+    return render_template(
+        "search.html",
+        title="Search",
+        text=text,
+        results=results,
+        page=page,
+        has_next_page=has_next_page,
+    )
+
+
+@bp.app_template_global()
+def nav():
+    key = page_cache.nav_key()
+    html = page_cache.get(key)
+    if html is None:
+        html = Markup(render_template("_nav.html", all_buckets=bucket_summaries()))
+        page_cache.set(key, html)
+    return html
+
+
+@bp.app_template_global()
+def bucket_options():
+    # The options of the move items form, which change whenever the navigation bar does
+    key = f"{page_cache.nav_key()}:bucket_options"
+    html = page_cache.get(key)
+    if html is None:
+        html = Markup("").join(
+            Markup('<option value="{}">{}</option>').format(bucket_id, title)
+            for bucket_id, title in _bucket_choices()
+        )
+        page_cache.set(key, html)
+    return html
+
+
 @bp.route("/bucket/create/", methods=["GET", "POST"])
 def create_bucket():
     form = CreateBucketForm()
@@ -50,16 +161,14 @@ def create_bucket():
             description=form.description.data,
         )
         db.session.add(bucket)
-        db.session.commit()
-        return redirect(f"/bucket/{bucket.id}/")
-    else:
-        all_buckets = Bucket.query.order_by("id")
-        return render_template(
-            "update_bucket.html",
-            title="Create new bucket",
-            all_buckets=all_buckets,
-            form=form,
-        )
+        if _commit_bucket(form):
+            page_cache.invalidate_bucket(bucket.id)
+            return redirect(f"/bucket/{bucket.id}/")
+    return render_template(
+        "update_bucket.html",
+        title="Create new bucket",
+        form=form,
+    )
 
 
 @bp.route("/bucket/<bucket_id>/update/", methods=["GET", "POST"])
@@ -70,16 +179,14 @@ def update_bucket(bucket_id):
         bucket.title = form.title.data
         bucket.description = form.description.data
         db.session.add(bucket)
-        db.session.commit()
-        return redirect(f"/bucket/{bucket.id}/")
-    else:
-        all_buckets = Bucket.query.order_by("id")
-        return render_template(
-            "update_bucket.html",
-            title="Create new bucket",
-            all_buckets=all_buckets,
-            form=form,
-        )
+        if _commit_bucket(form):
+            page_cache.invalidate_bucket(bucket.id)
+            return redirect(f"/bucket/{bucket.id}/")
+    return render_template(
+        "update_bucket.html",
+        title="Create new bucket",
+        form=form,
+    )
 
 
 @bp.route("/bucket/<bucket_id>/item/create/", methods=["GET", "POST"])
@@ -96,14 +203,13 @@ def create_item(bucket_id):
         bucket.items.append(item)
         db.session.add(bucket)
         db.session.commit()
+        page_cache.invalidate_bucket(bucket.id)
         return redirect(f"/bucket/{bucket.id}/")
     else:
-        all_buckets = Bucket.query.order_by("id")
         return render_template(
             "update_item.html",
             title=f"Create new item in {bucket.title}",
             bucket=bucket,
-            all_buckets=all_buckets,
             form=form,
         )
 
@@ -113,25 +219,44 @@ def update_item(bucket_id, item_id):
     bucket = _get_bucket(bucket_id)
     item = _get_item(item_id)
     form = UpdateItemForm(obj=item)
+    form.bucket_id.choices = _bucket_choices()
     if form.validate_on_submit():
         item.title = form.title.data
         item.description = form.description.data or None
         item.due_date = form.due_date.data
         item.flagged = form.flagged.data
         db.session.add(item)
+        bucket_ids = {bucket.id, item.bucket_id, form.bucket_id.data}
+        if form.bucket_id.data != item.bucket_id:
+            move_items_to_bucket([item.id], _get_bucket(form.bucket_id.data))
         db.session.commit()
+        page_cache.invalidate_bucket(*bucket_ids)
         return redirect(f"/bucket/{bucket.id}/")
     else:
-        all_buckets = Bucket.query.order_by("id")
         return render_template(
             "update_item.html",
             title=f"Update item in {bucket.title}",
             bucket=bucket,
-            all_buckets=all_buckets,
             form=form,
         )
 
 
+@bp.route("/bucket/<int:bucket_id>/items/move/", methods=["POST"])
+def move_items(bucket_id):
+    bucket = _get_bucket(bucket_id)
+    form = MoveItemsForm(prefix="move")
+    form.bucket_id.choices = _bucket_choices()
+    # Nothing is moved when no items were selected
+    if form.validate_on_submit():
+        moved_from_bucket_ids = move_items_to_bucket(
+            form.item_ids.data, _get_bucket(form.bucket_id.data)
+        )
+        db.session.commit()
+        if moved_from_bucket_ids:
+            page_cache.invalidate_bucket(form.bucket_id.data, *moved_from_bucket_ids)
+    return redirect(f"/bucket/{bucket.id}/")
+
+
 @bp.route("/bucket/<bucket_id>/item/<item_id>/complete/")
 def complete_item(bucket_id, item_id):
     bucket = _get_bucket(bucket_id)
@@ -139,7 +264,8 @@ def complete_item(bucket_id, item_id):
     item.completed_time = datetime.utcnow()
     db.session.add(item)
     db.session.commit()
-    return redirect(f"/bucket/{bucket.id}/")
+    page_cache.invalidate_bucket(bucket.id, item.bucket_id)
+    return _item_removed_response(bucket)
 
 
 @bp.route("/bucket/<bucket_id>/item/<item_id>/due_date_plus_one_day/")
@@ -151,7 +277,8 @@ def item_due_date_plus_one_day(bucket_id, item_id):
     item.due_date = updated_due_date
     db.session.add(item)
     db.session.commit()
-    return redirect(f"/bucket/{bucket.id}/")
+    page_cache.invalidate_bucket(bucket.id, item.bucket_id)
+    return _item_changed_response(bucket, item)
 
 
 @bp.route("/bucket/<bucket_id>/item/<item_id>/flag/")
@@ -161,7 +288,8 @@ def flag_item(bucket_id, item_id):
     item.flagged = True
     db.session.add(item)
     db.session.commit()
-    return redirect(f"/bucket/{bucket.id}/")
+    page_cache.invalidate_bucket(bucket.id, item.bucket_id)
+    return _item_changed_response(bucket, item)
 
 
 @bp.route("/bucket/<bucket_id>/item/<item_id>/unflag/")
@@ -171,6 +299,27 @@ def unflag_item(bucket_id, item_id):
     item.flagged = False
     db.session.add(item)
     db.session.commit()
+    page_cache.invalidate_bucket(bucket.id, item.bucket_id)
+    return _item_changed_response(bucket, item)
+
+
+@bp.route("/bucket/<bucket_id>/item/<item_id>/move_up/")
+def item_move_up(bucket_id, item_id):
+    bucket = _get_bucket(bucket_id)
+    item = _get_item(item_id)
+    move_item_up(item)
+    db.session.commit()
+    page_cache.invalidate_bucket(item.bucket_id)
+    return redirect(f"/bucket/{bucket.id}/")
+
+
+@bp.route("/bucket/<bucket_id>/item/<item_id>/move_down/")
+def item_move_down(bucket_id, item_id):
+    bucket = _get_bucket(bucket_id)
+    item = _get_item(item_id)
+    move_item_down(item)
+    db.session.commit()
+    page_cache.invalidate_bucket(item.bucket_id)
     return redirect(f"/bucket/{bucket.id}/")
 
 
@@ -178,11 +327,110 @@ def unflag_item(bucket_id, item_id):
 def delete_item(bucket_id, item_id):
     bucket = _get_bucket(bucket_id)
     item = _get_item(item_id)
+    item_bucket_id = item.bucket_id
     db.session.delete(item)
     db.session.commit()
+    page_cache.invalidate_bucket(bucket.id, item_bucket_id)
+    return _item_removed_response(bucket)
+
+
+def _item_changed_response(bucket, item):
+    if _wants_fragment():
+        return render_template("_item_rows.html", bucket=bucket, items=[item])
     return redirect(f"/bucket/{bucket.id}/")
 
 
+def _item_removed_response(bucket):
+    if _wants_fragment():
+        return "", 204
+    return redirect(f"/bucket/{bucket.id}/")
+
+
+def _wants_fragment():
+    # Set by the bucket page when it performs an item action in the background
+    return request.headers.get("X-Requested-With") == "XMLHttpRequest"
+
+
+def _commit_bucket(form):
+    # The validator checks title uniqueness up front, but a concurrent request can still
+    # take the title before we commit
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        form.title.errors.append(BUCKET_TITLE_NOT_UNIQUE)
+        return False
+    return True
+
+
+def _with_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Browsers must check the page is unchanged before reusing it, and must not share it as
+    # it contains the user's CSRF token
+    response.cache_control.no_cache = True
+    response.cache_control.private = True
+    return response
+
+
+def _bucket_page(bucket_id):
+    # Only the first page of a bucket is cached, as it is the one viewed most often
+    after_id = request.args.get("after", type=int)
+    key = page_cache.bucket_key(bucket_id) if after_id is None else None
+    page = page_cache.get(key) if key else None
+    if page is None:
+        bucket = _get_bucket(bucket_id)
+        items, next_after_id = _open_items_page(bucket)
+        rows = render_template(
+            "_item_rows.html",
+            bucket=bucket,
+            items=items,
+            next_after_id=next_after_id,
+        )
+        page = {
+            "id": bucket.id,
+            "title": bucket.title,
+            "description": bucket.description,
+            "rows": Markup(rows),
+        }
+        if key:
+            page_cache.set(key, page)
+    return page
+
+
+def _open_items_page(bucket):
+    return bucket.open_items_page(
+        current_app.config["BUCKET_PAGE_SIZE"],
+        after_id=request.args.get("after", type=int),
+    )
+
+
+def _history_cursor():
+    # The completed time and id of the last item on the previous page of a bucket's history
+    before = request.args.get("before")
+    if before is None:
+        return None
+    try:
+        completed_time, item_id = before.split(",")
+        return datetime.fromisoformat(completed_time), int(item_id)
+    except ValueError:
+        abort(400)
+
+
+def _bucket_choices():
+    return [(summary.id, summary.title) for summary in bucket_summaries()]
+
+
+def _bucket_ids():
+    # Cached along with the navigation bar, which changes whenever a bucket is created
+    key = f"{page_cache.nav_key()}:bucket_ids"
+    bucket_ids = page_cache.get(key)
+    if bucket_ids is None:
+        bucket_ids = frozenset(db.session.scalars(db.select(Bucket.id)))
+        page_cache.set(key, bucket_ids)
+    return bucket_ids
+
+
 def _get_bucket(bucket_id):
     bucket = Bucket.query.get(bucket_id)
     if bucket is None:
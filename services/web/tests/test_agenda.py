@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from src.database import db, agenda
+
+TODAY = date(2020, 7, 15)
+
+
+class TestAgenda:
+    def test_sections(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Overdue", due_date=TODAY - timedelta(days=1))
+        factory.item(bucket, "Due today", due_date=TODAY)
+        factory.item(bucket, "Due in a week", due_date=TODAY + timedelta(days=7))
+        factory.item(bucket, "Due in a month", due_date=TODAY + timedelta(days=30))
+        factory.item(bucket, "Flagged", flagged=True)
+        factory.item(bucket, "Flagged and due", due_date=TODAY, flagged=True)
+        factory.item(bucket, "Nothing")
+        factory.item(bucket, "Completed", due_date=TODAY, flagged=True, completed=True)
+
+        result = agenda(TODAY, due_soon_days=7, limit=10)
+
+        assert _titles(result.overdue) == ["Overdue"]
+        assert _titles(result.due_soon) == ["Due today", "Flagged and due", "Due in a week"]
+        assert _titles(result.flagged) == ["Flagged"]
+        assert {bucket_title for _, bucket_title in result.due_soon} == {"Shopping"}
+
+    def test_across_buckets(self, test_client, factory):
+        for title in ["Shopping", "Work", "Home"]:
+            factory.item(factory.bucket(title), f"{title} task", flagged=True)
+
+        result = agenda(TODAY, due_soon_days=7, limit=10)
+
+        assert [bucket_title for _, bucket_title in result.flagged] == ["Shopping", "Work", "Home"]
+
+    def test_limit(self, test_client, factory):
+        bucket = factory.bucket()
+        for number in range(3):
+            factory.item(bucket, f"Overdue {number}", due_date=TODAY - timedelta(days=number + 1))
+
+        result = agenda(TODAY, due_soon_days=7, limit=2)
+
+        assert _titles(result.overdue) == ["Overdue 2", "Overdue 1"]
+
+
+class TestAgendaPage:
+    def test_agenda_page(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes", due_date=date.today() - timedelta(days=1))
+
+        response = test_client.get("/agenda/")
+
+        assert response.status_code == 200
+        assert b"<h2>Agenda</h2>" in response.data
+        assert b">Tomatoes</a>" in response.data
+        assert b"Nothing due soon" in response.data
+        assert b"Nothing flagged" in response.data
+
+    def test_queries_do_not_grow_with_buckets(self, test_client, factory):
+        for number in range(20):
+            factory.item(factory.bucket(f"Bucket {number}"), "Task", flagged=True)
+        test_client.application.extensions["page_cache"].enabled = False
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+        test_client.get("/agenda/")
+
+        assert len(statements) == 4  # The three sections and the navigation bar
+
+
+class TestAgendaApi:
+    def test_agenda(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes", flagged=True)
+
+        response = test_client.get("/api/v1/agenda/")
+
+        assert response.status_code == 200
+        assert response.json["overdue"] == []
+        assert response.json["due_soon"] == []
+        assert [item["title"] for item in response.json["flagged"]] == ["Tomatoes"]
+        assert response.json["flagged"][0]["bucket"] == "Shopping"
+
+    def test_limit_below_one__one_item(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes", flagged=True)
+        factory.item(bucket, "Carrots", flagged=True)
+
+        response = test_client.get("/api/v1/agenda/?limit=-5")
+
+        assert [item["title"] for item in response.json["flagged"]] == ["Tomatoes"]
+
+
+def _titles(items):
+    return [item.title for item, _ in items]
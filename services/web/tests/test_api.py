@@ -0,0 +1,274 @@
+import json
+from datetime import date, datetime
+
+from src.database import db, Item
+
+
+class TestBuckets:
+    def test_buckets(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes", "Carrots"])
+
+        response = test_client.get("/api/v1/buckets/")
+
+        assert response.status_code == 200
+        assert response.json == {
+            "buckets": [
+                {
+                    "id": bucket.id,
+                    "title": "Shopping",
+                    "open_count": 2,
+                    "overdue_count": 0,
+                    "flagged_count": 0,
+                }
+            ]
+        }
+
+
+class TestBucketItems:
+    def test_bucket_items(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes", due_date=date(2020, 1, 30), flagged=True)
+
+        response = test_client.get(f"/api/v1/buckets/{bucket.id}/items/")
+
+        assert response.status_code == 200
+        assert response.json == {
+            "items": [
+                {
+                    "id": tomatoes.id,
+                    "bucket_id": bucket.id,
+                    "title": "Tomatoes",
+                    "description": None,
+                    "created_time": tomatoes.created_time.isoformat(),
+                    "due_date": "2020-01-30",
+                    "completed_time": None,
+                    "flagged": True,
+                }
+            ],
+            "next_after": None,
+        }
+
+    def test_pagination(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes", "Carrots", "Potatoes"])
+        tomatoes = _get_item("Tomatoes")
+        carrots = _get_item("Carrots")
+
+        response = test_client.get(
+            f"/api/v1/buckets/{bucket.id}/items/?limit=1&after={tomatoes.id}"
+        )
+
+        assert response.status_code == 200
+        assert [item["title"] for item in response.json["items"]] == ["Carrots"]
+        assert response.json["next_after"] == carrots.id
+
+    def test_limit_below_one__one_item(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes", "Carrots"])
+
+        for limit in (0, -1):
+            response = test_client.get(f"/api/v1/buckets/{bucket.id}/items/?limit={limit}")
+
+            assert response.status_code == 200
+            assert [item["title"] for item in response.json["items"]] == ["Tomatoes"]
+
+    def test_bucket_not_found__404_error(self, test_client):
+        response = test_client.get("/api/v1/buckets/9/items/")
+
+        assert response.status_code == 404
+        assert response.json == {"error": "Bucket not found."}
+
+
+class TestBulkItemActions:
+    def test_complete_items(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes", "Carrots", "Potatoes"])
+        tomatoes = _get_item("Tomatoes")
+        carrots = _get_item("Carrots")
+
+        response = test_client.post(
+            "/api/v1/items/complete/", json={"ids": [tomatoes.id, carrots.id, 99]}
+        )
+
+        assert response.status_code == 200
+        assert response.json == {
+            "results": [
+                {"id": tomatoes.id, "status": "ok"},
+                {"id": carrots.id, "status": "ok"},
+                {"id": 99, "status": "not_found"},
+            ]
+        }
+        assert [item.title for item in bucket.incomplete_items] == ["Potatoes"]
+
+    def test_complete_already_completed_item__keeps_completed_time(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
+        tomatoes.completed_time = datetime(2020, 7, 28, 8, 4)
+        db.session.commit()
+
+        response = test_client.post("/api/v1/items/complete/", json={"ids": [tomatoes.id]})
+
+        assert response.json == {"results": [{"id": tomatoes.id, "status": "ok"}]}
+        assert _get_item("Tomatoes").completed_time == datetime(2020, 7, 28, 8, 4)
+
+    def test_flag_and_unflag_items(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
+        carrots = factory.item(bucket, "Carrots", flagged=True)
+
+        test_client.post("/api/v1/items/flag/", json={"ids": [tomatoes.id]})
+        test_client.post("/api/v1/items/unflag/", json={"ids": [carrots.id]})
+
+        assert _get_item("Tomatoes").flagged
+        assert not _get_item("Carrots").flagged
+
+    def test_reschedule_items(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
+        carrots = factory.item(bucket, "Carrots", due_date=date(2020, 1, 1))
+
+        response = test_client.post(
+            "/api/v1/items/reschedule/",
+            json={"ids": [tomatoes.id, carrots.id], "due_date": "2020-01-30"},
+        )
+
+        assert response.status_code == 200
+        assert _get_item("Tomatoes").due_date == date(2020, 1, 30)
+        assert _get_item("Carrots").due_date == date(2020, 1, 30)
+
+    def test_bulk_update_sets_updated_time(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket, title="Tomatoes")
+        created_updated_time = item.updated_time
+
+        test_client.post("/api/v1/items/flag/", json={"ids": [item.id]})
+
+        db.session.expire_all()
+        assert _get_item("Tomatoes").updated_time > created_updated_time
+
+    def test_reschedule_invalid_due_date__400_error(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
+
+        response = test_client.post(
+            "/api/v1/items/reschedule/", json={"ids": [tomatoes.id], "due_date": "20200130"}
+        )
+
+        assert response.status_code == 400
+
+    def test_move_items(self, test_client, factory):
+        shopping = factory.bucket(item_titles=["Tomatoes", "Carrots"])
+        inbox = factory.bucket(title="Inbox")
+        tomatoes = _get_item("Tomatoes")
+
+        response = test_client.post(
+            "/api/v1/items/move/", json={"ids": [tomatoes.id], "bucket_id": inbox.id}
+        )
+
+        assert response.status_code == 200
+        assert [item.title for item in inbox.incomplete_items] == ["Tomatoes"]
+        assert [item.title for item in shopping.incomplete_items] == ["Carrots"]
+
+    def test_move_to_unknown_bucket__400_error(self, test_client, factory):
+        factory.bucket(item_titles=["Tomatoes"])
+        tomatoes = _get_item("Tomatoes")
+
+        response = test_client.post(
+            "/api/v1/items/move/", json={"ids": [tomatoes.id], "bucket_id": 9}
+        )
+
+        assert response.status_code == 400
+
+    def test_move_to_boolean_bucket_id__400_error(self, test_client, factory):
+        factory.bucket(item_titles=["Tomatoes"])
+        tomatoes = _get_item("Tomatoes")
+
+        response = test_client.post(
+            "/api/v1/items/move/", json={"ids": [tomatoes.id], "bucket_id": True}
+        )
+
+        assert response.status_code == 400
+
+    def test_delete_items(self, test_client, factory):
+        factory.bucket(item_titles=["Tomatoes", "Carrots"])
+        tomatoes_id = _get_item("Tomatoes").id
+
+        response = test_client.post("/api/v1/items/delete/", json={"ids": [tomatoes_id]})
+
+        assert response.json == {"results": [{"id": tomatoes_id, "status": "ok"}]}
+        assert _get_item("Tomatoes") is None
+        assert _get_item("Carrots") is not None
+
+    def test_ids_not_provided__400_error(self, test_client):
+        response = test_client.post("/api/v1/items/complete/", json={"ids": []})
+
+        assert response.status_code == 400
+        assert response.json == {"error": "ids must be a non-empty list of item ids."}
+
+    def test_boolean_ids__400_error(self, test_client):
+        response = test_client.post("/api/v1/items/complete/", json={"ids": [True]})
+
+        assert response.status_code == 400
+
+    def test_too_many_ids__400_error(self, test_client):
+        test_client.application.config["API_MAX_BATCH_SIZE"] = 2
+
+        response = test_client.post("/api/v1/items/complete/", json={"ids": [1, 2, 3]})
+
+        assert response.status_code == 400
+
+
+class TestExport:
+    def test_jsonl(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+
+        response = test_client.get("/api/v1/export/")
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        assert response.headers["Content-Disposition"] == "attachment; filename=my-stuff.jsonl"
+        records = [json.loads(line) for line in response.data.splitlines()]
+        assert [(record["type"], record["title"]) for record in records] == [
+            ("bucket", "Shopping"),
+            ("item", "Tomatoes"),
+        ]
+        assert records[1]["bucket"] == bucket.title
+
+    def test_csv_filtered_by_bucket(self, test_client, factory):
+        factory.bucket(item_titles=["Tomatoes"])
+        other_bucket = factory.bucket(title="Inbox", item_titles=["Report"])
+
+        response = test_client.get(f"/api/v1/export/?format=csv&bucket_id={other_bucket.id}")
+
+        assert response.mimetype == "text/csv"
+        lines = response.data.decode().splitlines()
+        assert lines[0].startswith("type,id,bucket,title,")
+        assert [line.split(",")[3] for line in lines[1:]] == ["Inbox", "Report"]
+
+    def test_updated_since(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, title="Tomatoes")
+        since = datetime.utcnow()
+        factory.item(bucket, title="Carrots")
+
+        response = test_client.get(f"/api/v1/export/?updated_since={since.isoformat()}")
+
+        titles = [json.loads(line)["title"] for line in response.data.splitlines()]
+        assert titles == ["Shopping", "Carrots"]
+
+    def test_unknown_format__400_error(self, test_client):
+        response = test_client.get("/api/v1/export/?format=xml")
+
+        assert response.status_code == 400
+        assert response.json == {"error": "format must be one of csv, jsonl."}
+
+    def test_invalid_time__400_error(self, test_client):
+        response = test_client.get("/api/v1/export/?completed_after=yesterday")
+
+        assert response.status_code == 400
+
+    def test_bucket_not_found__404_error(self, test_client):
+        response = test_client.get("/api/v1/export/?bucket_id=99")
+
+        assert response.status_code == 404
+
+
+def _get_item(title):
+    return db.session.query(Item).filter_by(title=title).first()
@@ -0,0 +1,41 @@
+from src import create_app
+from src.config import Config
+
+
+class TestCreateApp:
+    def test_everything_loaded(self):
+        app = create_app()
+
+        assert "main" in app.blueprints
+        assert "api_v1" in app.blueprints
+        assert "migrate" in app.extensions
+        assert list(app.extensions["startup_times"]) == [
+            "database",
+            "migrations",
+            "instrumentation",
+            "cache",
+            "metrics",
+            "dates",
+            "views",
+            "api",
+        ]
+
+    def test_database_only(self):
+        app = create_app(views=False, migrations=False)
+
+        assert app.blueprints == {}
+        assert "migrate" not in app.extensions
+        assert list(app.extensions["startup_times"]) == ["database", "instrumentation", "cache"]
+
+
+class TestTemplateCache:
+    def test_templates_compiled_to_cache_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(Config, "TEMPLATE_CACHE_DIR", str(tmp_path))
+
+        create_app().jinja_env.get_template("bucket.html")
+        create_app().jinja_env.get_template("bucket.html")
+
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_no_cache_dir__compiled_in_memory(self):
+        assert create_app().jinja_env.bytecode_cache is None
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from src.archive import archive_items
+from src.database import ArchivedItem, Item
+
+
+class TestArchiveItems:
+    def test_items_completed_before_are_archived(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes", completed_time=datetime(2020, 1, 1))
+        factory.item(bucket, "Carrots", completed_time=datetime(2020, 6, 1))
+        factory.item(bucket, "Kale")
+
+        archived = archive_items(datetime(2020, 3, 1))
+
+        assert archived == 1
+        assert [item.title for item in Item.query.order_by(Item.id)] == ["Carrots", "Kale"]
+        archived_item = ArchivedItem.query.one()
+        assert archived_item.title == "Tomatoes"
+        assert archived_item.bucket_id == bucket.id
+        assert archived_item.completed_time == datetime(2020, 1, 1)
+        assert archived_item.archived_time is not None
+
+    def test_archived_in_batches(self, test_client, factory):
+        bucket = factory.bucket()
+        for number in range(5):
+            factory.item(bucket, f"Item {number}", completed_time=datetime(2020, 1, 1))
+        progress = []
+
+        archived = archive_items(datetime(2020, 3, 1), batch_size=2, progress=progress.append)
+
+        assert archived == 5
+        assert progress == [2, 4, 5]
+        assert Item.query.count() == 0
+        assert ArchivedItem.query.count() == 5
+
+
+class TestBucketHistory:
+    def test_completed_and_archived_items_shown(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes", completed_time=datetime(2020, 1, 1))
+        factory.item(bucket, "Carrots", completed_time=datetime(2020, 6, 1))
+        factory.item(bucket, "Kale")
+        archive_items(datetime(2020, 3, 1))
+
+        response = test_client.get(f"/bucket/{bucket.id}/history/")
+
+        assert response.status_code == 200
+        assert b"History of Shopping" in response.data
+        html = response.data.decode()
+        assert html.index("Carrots") < html.index("Tomatoes")
+        assert '2020-01-01 <span class="muted">(archived)</span>' in html
+        assert "Kale" not in html
+
+    def test_pagination(self, test_client, factory):
+        test_client.application.config["BUCKET_PAGE_SIZE"] = 2
+        bucket = factory.bucket()
+        for day in range(1, 4):
+            factory.item(bucket, f"Item {day}", completed_time=datetime(2020, 1, day))
+        archive_items(datetime(2020, 1, 2))
+
+        first_page = test_client.get(f"/bucket/{bucket.id}/history/")
+        next_page = first_page.data.decode().split("history/?before=")[1].split('"')[0]
+        second_page = test_client.get(f"/bucket/{bucket.id}/history/?before={next_page}")
+
+        assert b"Item 3" in first_page.data and b"Item 2" in first_page.data
+        assert b"Item 1" not in first_page.data
+        assert b"Item 1" in second_page.data
+        assert b"More items" not in second_page.data
+
+    def test_invalid_cursor__400_error(self, test_client, factory):
+        bucket = factory.bucket()
+
+        response = test_client.get(f"/bucket/{bucket.id}/history/?before=yesterday")
+
+        assert response.status_code == 400
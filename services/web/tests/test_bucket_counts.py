@@ -0,0 +1,265 @@
+import json
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event
+
+from src.database import (
+    db,
+    bucket_count_errors,
+    bucket_summaries,
+    move_items_to_bucket,
+    recount_buckets,
+    refresh_overdue_counts,
+    Bucket,
+    Item,
+)
+from src.importer import import_items
+
+YESTERDAY = date.today() - timedelta(days=1)
+TOMORROW = date.today() + timedelta(days=1)
+
+
+class TestBucketCounts:
+    def test_new_items(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes")
+        factory.item(bucket, "Carrots", due_date=YESTERDAY, flagged=True)
+        factory.item(bucket, "Potatoes", due_date=TOMORROW)
+        factory.item(bucket, "Onions", completed=True)
+
+        assert _counts(bucket) == (3, 1, 1)
+
+    def test_items_added_with_new_bucket(self, test_client):
+        bucket = Bucket(title="Shopping", description="Groceries we need")
+        bucket.items.append(Item(title="Tomatoes", flagged=True))
+        bucket.items.append(Item(title="Carrots", due_date=YESTERDAY))
+        db.session.add(bucket)
+        db.session.commit()
+
+        assert _counts(bucket) == (2, 1, 1)
+
+    def test_completed_item(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket, "Tomatoes", due_date=YESTERDAY, flagged=True)
+
+        item.completed_time = datetime.utcnow()
+        db.session.commit()
+
+        assert _counts(bucket) == (0, 0, 0)
+
+    def test_changed_item(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket, "Tomatoes", due_date=TOMORROW)
+
+        item.due_date = YESTERDAY
+        item.flagged = True
+        db.session.commit()
+        assert _counts(bucket) == (1, 1, 1)
+
+        item.due_date = None
+        item.flagged = False
+        db.session.commit()
+        assert _counts(bucket) == (1, 0, 0)
+
+    def test_title_change_leaves_counts(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket, "Tomatoes", due_date=YESTERDAY, flagged=True)
+
+        item.title = "Cherry tomatoes"
+        db.session.commit()
+
+        assert _counts(bucket) == (1, 1, 1)
+
+    def test_moved_item(self, test_client, factory):
+        bucket = factory.bucket()
+        other_bucket = factory.bucket("Work")
+        item = factory.item(bucket, "Tomatoes", due_date=YESTERDAY, flagged=True)
+
+        item.bucket = other_bucket
+        db.session.commit()
+
+        assert _counts(bucket) == (0, 0, 0)
+        assert _counts(other_bucket) == (1, 1, 1)
+
+    def test_deleted_item(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket, "Tomatoes", due_date=YESTERDAY, flagged=True)
+        factory.item(bucket, "Carrots")
+
+        db.session.delete(item)
+        db.session.commit()
+
+        assert _counts(bucket) == (1, 0, 0)
+
+    def test_rolled_back_changes(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket, "Tomatoes")
+
+        item.flagged = True
+        db.session.flush()
+        db.session.rollback()
+
+        assert _counts(bucket) == (1, 0, 0)
+
+    def test_api_bulk_changes(self, test_client, factory):
+        bucket = factory.bucket()
+        items = [factory.item(bucket, title) for title in ["Tomatoes", "Carrots", "Onions"]]
+
+        test_client.post("/api/v1/items/flag/", json={"ids": [items[0].id, items[1].id]})
+        test_client.post("/api/v1/items/complete/", json={"ids": [items[1].id]})
+        test_client.post("/api/v1/items/delete/", json={"ids": [items[2].id]})
+
+        assert _counts(bucket) == (1, 0, 1)
+        assert bucket_count_errors() == []
+
+    def test_api_bulk_changes_counted_without_recounting(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes", due_date=TOMORROW)
+        carrots = factory.item(bucket, "Carrots", due_date=YESTERDAY, flagged=True)
+        statements = []
+        event.listen(
+            db.engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        test_client.post(
+            "/api/v1/items/reschedule/",
+            json={"ids": [tomatoes.id], "due_date": YESTERDAY.isoformat()},
+        )
+        test_client.post("/api/v1/items/unflag/", json={"ids": [carrots.id]})
+
+        assert _counts(bucket) == (2, 2, 0)
+        assert not [sql for sql in statements if "count(" in sql]
+        assert bucket_count_errors() == []
+
+    def test_imported_items(self, test_client, factory, tmp_path):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes")
+        path = tmp_path / "items.jsonl"
+        path.write_text(
+            json.dumps({"bucket": "Shopping", "title": "Kale", "flagged": True})
+            + "\n"
+            + json.dumps({"bucket": "Shopping", "title": "Leeks", "due_date": "2020-01-30"})
+            + "\n"
+        )
+
+        import_items(str(path), "jsonl")
+
+        assert _counts(bucket) == (3, 1, 1)
+        assert bucket_count_errors() == []
+
+
+class TestMoveItemsToBucket:
+    def test_counts_moved(self, test_client, factory):
+        bucket = factory.bucket()
+        other_bucket = factory.bucket("Work")
+        items = [
+            factory.item(bucket, "Tomatoes", due_date=YESTERDAY, flagged=True),
+            factory.item(bucket, "Carrots", completed=True),
+            factory.item(other_bucket, "Report"),
+        ]
+        inbox = factory.bucket("Inbox")
+
+        moved_from = move_items_to_bucket([item.id for item in items], inbox)
+        db.session.commit()
+
+        assert sorted(moved_from) == [bucket.id, other_bucket.id]
+        assert _counts(bucket) == (0, 0, 0)
+        assert _counts(other_bucket) == (0, 0, 0)
+        assert _counts(inbox) == (2, 1, 1)
+        assert bucket_count_errors() == []
+
+    def test_items_already_in_bucket(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket, "Tomatoes")
+
+        assert move_items_to_bucket([item.id], bucket) == []
+        assert _counts(bucket) == (1, 0, 0)
+
+    def test_one_update_of_items(self, test_client, factory):
+        bucket = factory.bucket()
+        item_ids = [factory.item(bucket, f"Item {number}").id for number in range(5)]
+        inbox = factory.bucket("Inbox")
+        statements = []
+        event.listen(
+            db.engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        move_items_to_bucket(item_ids, inbox)
+
+        assert len([sql for sql in statements if sql.startswith("UPDATE item ")]) == 1
+        assert not [sql for sql in statements if sql.startswith("SELECT item.id, ")]
+
+
+class TestBucketSummaries:
+    def test_summaries(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes", due_date=YESTERDAY, flagged=True)
+
+        assert bucket_summaries() == [(bucket.id, "Shopping", 1, 1, 1)]
+
+    def test_overdue_counted_again_each_day(self, test_client, factory):
+        bucket = factory.bucket()
+        # Due today when counted yesterday, so not overdue until today
+        factory.item(bucket, "Tomatoes", due_date=YESTERDAY)
+        recount_buckets()
+        db.session.execute(
+            db.update(Bucket).values(overdue_count=0, overdue_counted_date=YESTERDAY)
+        )
+        db.session.commit()
+
+        statements = []
+        event.listen(
+            db.engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        assert bucket_summaries() == [(bucket.id, "Shopping", 1, 1, 0)]
+        assert not [sql for sql in statements if not sql.startswith("SELECT ")]
+
+    def test_overdue_counts_refreshed(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes", due_date=YESTERDAY)
+        db.session.execute(
+            db.update(Bucket).values(overdue_count=0, overdue_counted_date=YESTERDAY)
+        )
+
+        refresh_overdue_counts(date.today())
+        db.session.commit()
+
+        assert _counts(bucket) == (1, 1, 0)
+        assert db.session.get(Bucket, bucket.id).overdue_counted_date == date.today()
+
+
+class TestRecountBuckets:
+    def test_errors(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes", flagged=True)
+        db.session.execute(db.update(Bucket).values(open_count=5))
+        db.session.commit()
+
+        errors = bucket_count_errors()
+
+        assert [(error_bucket.id, wrong_counts) for error_bucket, wrong_counts in errors] == [
+            (bucket.id, [("open_count", 5, 1)])
+        ]
+
+    def test_recount(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes", due_date=YESTERDAY, flagged=True)
+        db.session.execute(db.update(Bucket).values(open_count=5, flagged_count=0))
+
+        recount_buckets([bucket.id])
+        db.session.commit()
+
+        assert _counts(bucket) == (1, 1, 1)
+        assert bucket_count_errors() == []
+
+
+def _counts(bucket):
+    bucket = db.session.get(Bucket, bucket.id, populate_existing=True)
+    return bucket.open_count, bucket.overdue_count, bucket.flagged_count
@@ -0,0 +1,264 @@
+import time
+
+from sqlalchemy import event
+
+from src import create_app
+from src.cache import page_cache, FileBackend, MemoryBackend
+from src.config import Config
+from src.database import db, Bucket, Item
+
+
+class TestMemoryBackend:
+    def test_least_recently_used_entry_is_evicted(self):
+        backend = MemoryBackend(max_entries=2)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.get("a")
+
+        evicted = backend.set("c", 3)
+
+        assert evicted == 1
+        assert backend.get("a") == 1
+        assert backend.get("b") is None
+        assert backend.get("c") == 3
+
+    def test_bump_version(self):
+        backend = MemoryBackend(max_entries=2)
+
+        backend.bump("bucket:1")
+        backend.bump("bucket:1")
+
+        assert backend.version("bucket:1") == 2
+        assert backend.version("bucket:2") == 0
+
+
+class TestFileBackend:
+    def test_set_and_get(self, tmp_path):
+        backend = FileBackend(str(tmp_path), max_entries=2)
+
+        backend.set("a", {"rows": "<tr></tr>"})
+
+        assert backend.get("a") == {"rows": "<tr></tr>"}
+        assert backend.get("b") is None
+        assert backend.size() == 1
+
+    def test_entries_beyond_max_are_evicted(self, tmp_path):
+        backend = FileBackend(str(tmp_path), max_entries=2)
+        backend.set("a", 1)
+        backend.set("b", 2)
+
+        evicted = backend.set("c", 3)
+
+        assert evicted == 1
+        assert backend.size() == 2
+
+    def test_versions_are_shared_between_instances(self, tmp_path):
+        backend = FileBackend(str(tmp_path), max_entries=2)
+        other_backend = FileBackend(str(tmp_path), max_entries=2)
+
+        backend.bump("bucket:1")
+        other_backend.bump("bucket:1")
+
+        assert backend.version("bucket:1") == 2
+        assert other_backend.version("bucket:2") == 0
+
+
+class TestSharedPageCache:
+    def test_invalidated_by_command(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(Config, "PAGE_CACHE_DIR", str(tmp_path))
+        web_app = create_app()
+        command_app = create_app(views=False, migrations=False)
+        with web_app.app_context():
+            key = page_cache.bucket_key(1)
+
+        with command_app.app_context():
+            page_cache.invalidate_bucket(1)
+
+        with web_app.app_context():
+            assert page_cache.bucket_key(1) != key
+
+
+class TestClearPageCache:
+    def test_file_backend_cleared(self, tmp_path):
+        backend = FileBackend(str(tmp_path), max_entries=2)
+        other_backend = FileBackend(str(tmp_path), max_entries=2)
+        backend.set("a", "A")
+        epoch = other_backend.epoch
+
+        backend.clear()
+
+        assert other_backend.epoch != epoch
+        assert other_backend.get("a") is None
+
+    def test_dropped_bucket_not_served(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+        test_client.get(f"/bucket/{bucket.id}/")
+        db.drop_all()
+        db.create_all()
+        page_cache.clear()
+        other_bucket = factory.bucket(title="Work", description="Jobs to do")
+
+        response = test_client.get(f"/bucket/{other_bucket.id}/")
+
+        assert other_bucket.id == bucket.id
+        assert b"<td>Tomatoes</td>" not in response.data
+
+    def test_unknown_bucket_not_served_from_cache(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+        test_client.get(f"/bucket/{bucket.id}/")
+        db.session.execute(db.delete(Item))
+        db.session.execute(db.delete(Bucket))
+        db.session.commit()
+        page_cache.invalidate_nav()
+
+        response = test_client.get(f"/bucket/{bucket.id}/")
+
+        assert response.status_code == 404
+
+
+class TestBucketPageCache:
+    def test_repeat_view_does_not_query_database(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+        test_client.get(f"/bucket/{bucket.id}/")
+
+        with _count_queries() as queries:
+            response = test_client.get(f"/bucket/{bucket.id}/")
+
+        assert response.status_code == 200
+        assert b"<td>Tomatoes</td>" in response.data
+        assert b"Shopping (1)" in response.data
+        assert queries == []
+
+    def test_item_action_invalidates_cached_page(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes", "Carrots"])
+        tomatoes = db.session.query(Item).filter_by(title="Tomatoes").first()
+        test_client.get(f"/bucket/{bucket.id}/")
+
+        response = test_client.get(
+            f"/bucket/{bucket.id}/item/{tomatoes.id}/complete/", follow_redirects=True
+        )
+
+        assert b"<td>Tomatoes</td>" not in response.data
+        assert b"Shopping (1)" in response.data
+
+    def test_create_bucket_invalidates_navigation(self, test_client, factory):
+        bucket = factory.bucket()
+        test_client.get(f"/bucket/{bucket.id}/")
+
+        test_client.post("/bucket/create/", data={"title": "Inbox", "description": "Things"})
+        response = test_client.get(f"/bucket/{bucket.id}/")
+
+        assert b"Inbox (0)" in response.data
+
+    def test_cache_disabled(self, test_client, factory):
+        test_client.application.extensions["page_cache"].enabled = False
+        bucket = factory.bucket()
+        test_client.get(f"/bucket/{bucket.id}/")
+
+        with _count_queries() as queries:
+            test_client.get(f"/bucket/{bucket.id}/")
+
+        assert queries != []
+
+    def test_stats(self, test_client, factory):
+        bucket = factory.bucket()
+        test_client.get(f"/bucket/{bucket.id}/")
+        test_client.get(f"/bucket/{bucket.id}/")
+
+        response = test_client.get("/api/v1/cache/")
+
+        # The bucket ids, bucket page, navigation bar and bucket options of the move items form
+        assert response.json == {
+            "backend": "MemoryBackend",
+            "entries": 4,
+            "max_entries": 512,
+            "hits": 4,
+            "misses": 4,
+            "evictions": 0,
+        }
+
+
+class TestBucketPageConditionalGet:
+    def test_validators_are_sent(self, test_client, factory):
+        bucket = factory.bucket()
+
+        response = test_client.get(f"/bucket/{bucket.id}/")
+
+        assert response.headers["ETag"]
+        assert response.headers["Last-Modified"]
+        assert response.cache_control.no_cache
+
+    def test_unchanged_etag__not_modified(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+        etag = test_client.get(f"/bucket/{bucket.id}/").headers["ETag"]
+
+        with _count_queries() as queries:
+            response = test_client.get(f"/bucket/{bucket.id}/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.headers["ETag"] == etag
+        assert queries == []
+
+    def test_changed_etag__page_rendered(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+        tomatoes = db.session.query(Item).filter_by(title="Tomatoes").first()
+        etag = test_client.get(f"/bucket/{bucket.id}/").headers["ETag"]
+        test_client.get(f"/bucket/{bucket.id}/item/{tomatoes.id}/flag/")
+
+        response = test_client.get(f"/bucket/{bucket.id}/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_change_to_other_bucket__page_rendered(self, test_client, factory):
+        bucket = factory.bucket()
+        other_bucket = factory.bucket(title="Inbox")
+        etag = test_client.get(f"/bucket/{bucket.id}/").headers["ETag"]
+        test_client.post(f"/bucket/{other_bucket.id}/", data={"title": "Tomatoes"})
+
+        response = test_client.get(f"/bucket/{bucket.id}/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+
+    def test_csrf_tokens_may_have_expired__page_rendered(self, test_client, factory):
+        test_client.application.config["WTF_CSRF_ENABLED"] = True
+        test_client.application.config["WTF_CSRF_TIME_LIMIT"] = 1
+        bucket = factory.bucket()
+        etag = test_client.get(f"/bucket/{bucket.id}/").headers["ETag"]
+        time.sleep(0.6)
+
+        response = test_client.get(f"/bucket/{bucket.id}/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_not_modified_since__not_modified(self, test_client, factory):
+        bucket = factory.bucket()
+        last_modified = test_client.get(f"/bucket/{bucket.id}/").headers["Last-Modified"]
+
+        response = test_client.get(
+            f"/bucket/{bucket.id}/", headers={"If-Modified-Since": last_modified}
+        )
+
+        assert response.status_code == 304
+
+    def test_later_pages_are_not_conditional(self, test_client, factory):
+        bucket = factory.bucket()
+
+        response = test_client.get(f"/bucket/{bucket.id}/?after=1")
+
+        assert "ETag" not in response.headers
+
+
+class _count_queries:
+    def __enter__(self):
+        self.statements = []
+        event.listen(db.engine, "before_cursor_execute", self._record)
+        return self.statements
+
+    def __exit__(self, *args):
+        event.remove(db.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
@@ -0,0 +1,62 @@
+from src.config import _engine_options
+from src.database import _set_statement_timeout, statement_timeout
+
+
+class TestEngineOptions:
+    def test_sqlite__no_pool_options(self):
+        assert _engine_options("sqlite://") == {"query_cache_size": 500}
+
+    def test_postgres__defaults(self):
+        options = _engine_options("postgresql://my_stuff@db/my_stuff")
+
+        assert options["pool_size"] == 5
+        assert options["max_overflow"] == 10
+        assert options["pool_pre_ping"] is True
+        assert options["connect_args"]["options"] == "-c statement_timeout=30000"
+
+    def test_postgres__from_environment(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_SIZE", "20")
+        monkeypatch.setenv("DB_POOL_RECYCLE", "600")
+        monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+        monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+
+        options = _engine_options("postgresql://my_stuff@db/my_stuff")
+
+        assert options["pool_size"] == 20
+        assert options["pool_recycle"] == 600
+        assert options["pool_pre_ping"] is False
+        assert options["connect_args"]["options"] == "-c statement_timeout=5000"
+
+
+class TestStatementTimeout:
+    def test_view_timeout_set_on_postgres(self, test_client):
+        connection = _Connection("postgresql")
+        with test_client.application.test_request_context():
+            statement_timeout(120000)(lambda: None)()
+            _set_statement_timeout(None, None, connection)
+
+        assert connection.statements == ["SET LOCAL statement_timeout = 120000"]
+
+    def test_default_timeout__nothing_set(self, test_client):
+        connection = _Connection("postgresql")
+        with test_client.application.test_request_context():
+            _set_statement_timeout(None, None, connection)
+
+        assert connection.statements == []
+
+    def test_sqlite__nothing_set(self, test_client):
+        connection = _Connection("sqlite")
+        with test_client.application.test_request_context():
+            statement_timeout(120000)(lambda: None)()
+            _set_statement_timeout(None, None, connection)
+
+        assert connection.statements == []
+
+
+class _Connection:
+    def __init__(self, dialect_name):
+        self.dialect = type("Dialect", (), {"name": dialect_name})
+        self.statements = []
+
+    def exec_driver_sql(self, statement):
+        self.statements.append(statement)
@@ -0,0 +1,36 @@
+from datetime import date, timedelta
+
+from unittest.mock import patch
+
+from humanize import naturaldate
+
+from src.dates import DateLabels
+
+
+class TestDateLabels:
+    def test_label_matches_naturaldate(self):
+        labels = DateLabels()
+        today = date.today()
+
+        for due_date in [today - timedelta(days=1), today, today + timedelta(days=1)]:
+            assert labels.label(due_date) == naturaldate(due_date).title()
+        assert labels.label(date(2020, 1, 30)) == "Jan 30 2020"
+        assert labels.label(None) is None
+
+    @patch("src.dates.naturaldate", wraps=naturaldate)
+    def test_label_worked_out_once_per_date(self, mock_naturaldate):
+        labels = DateLabels()
+
+        for _ in range(3):
+            labels.label(date(2020, 1, 30))
+            labels.label(date(2020, 1, 31))
+
+        assert mock_naturaldate.call_count == 2
+
+    def test_is_overdue(self):
+        labels = DateLabels()
+        today = date.today()
+
+        assert labels.is_overdue(today - timedelta(days=1))
+        assert not labels.is_overdue(today)
+        assert not labels.is_overdue(None)
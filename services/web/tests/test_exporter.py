@@ -0,0 +1,72 @@
+import json
+from datetime import datetime
+
+from src.archive import archive_items
+from src.database import db, Bucket, Item
+from src.exporter import export_records
+from src.importer import import_items
+
+
+class TestExportRecords:
+    def test_chunks(self, test_client, factory):
+        factory.bucket(item_titles=["Tomatoes", "Carrots", "Kale"])
+
+        chunks = list(export_records("jsonl", chunk_size=2))
+
+        assert [chunk.count("\n") for chunk in chunks] == [1, 2, 1]
+
+    def test_completed_window(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+        for title, completed_time in [
+            ("Carrots", datetime(2020, 7, 1, 12)),
+            ("Kale", datetime(2020, 7, 2, 12)),
+            ("Leeks", datetime(2020, 7, 3, 12)),
+        ]:
+            bucket.items.append(Item(title=title, completed_time=completed_time))
+        db.session.commit()
+
+        records = _export(
+            "jsonl", completed_after=datetime(2020, 7, 2), completed_before=datetime(2020, 7, 3)
+        )
+
+        assert [record["title"] for record in records if record["type"] == "item"] == ["Kale"]
+
+    def test_archived_items_included(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+        bucket.items.append(Item(title="Carrots", completed_time=datetime(2020, 7, 1)))
+        db.session.commit()
+        archive_items(datetime(2020, 8, 1))
+
+        records = _export("jsonl")
+
+        assert [record["title"] for record in records if record["type"] == "item"] == [
+            "Tomatoes",
+            "Carrots",
+        ]
+
+    def test_csv_export_can_be_imported(self, test_client, tmp_path, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+        bucket.items.append(Item(title="Carrots", description="Big, orange", flagged=True))
+        db.session.commit()
+        path = tmp_path / "export.csv"
+        path.write_text("".join(export_records("csv")))
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+        import_items(str(path), "csv")
+
+        bucket = Bucket.query.one()
+        assert (bucket.title, bucket.description) == ("Shopping", "Groceries we need")
+        carrots = Item.query.filter_by(title="Carrots").one()
+        assert carrots.bucket == bucket
+        assert carrots.description == "Big, orange"
+        assert carrots.flagged
+
+
+def _export(file_format, **filters):
+    return [
+        json.loads(line)
+        for line in "".join(export_records(file_format, **filters)).split("\n")
+        if line
+    ]
@@ -0,0 +1,131 @@
+import json
+from datetime import date, datetime
+
+import pytest
+
+from src.database import db, Bucket, Item
+from src.importer import import_items, InvalidRecord
+
+
+class TestImportItems:
+    def test_csv(self, test_client, tmp_path):
+        path = _write(
+            tmp_path / "items.csv",
+            "bucket,title,description,created_time,due_date,completed_time,flagged\n"
+            "Shopping,Tomatoes,,2020-07-01 09:30:00,2020-08-01,,true\n"
+            'Shopping,Carrots,"Big, orange",,,2020-07-02 10:00:00,no\n',
+        )
+
+        records = import_items(path, "csv")
+
+        assert records == 2
+        tomatoes = Item.query.filter_by(title="Tomatoes").one()
+        assert tomatoes.bucket.title == "Shopping"
+        assert tomatoes.description is None
+        assert tomatoes.created_time == datetime(2020, 7, 1, 9, 30)
+        assert tomatoes.due_date == date(2020, 8, 1)
+        assert tomatoes.completed_time is None
+        assert tomatoes.flagged
+        carrots = Item.query.filter_by(title="Carrots").one()
+        assert carrots.description == "Big, orange"
+        assert carrots.completed_time == datetime(2020, 7, 2, 10)
+        assert not carrots.flagged
+
+    def test_jsonl(self, test_client, tmp_path):
+        path = _write_jsonl(
+            tmp_path / "items.jsonl",
+            [{"title": "Tomatoes", "flagged": True}, {"bucket": "Work", "title": "Report"}],
+        )
+
+        import_items(path, "jsonl")
+
+        assert Item.query.filter_by(title="Tomatoes").one().bucket.title == "Inbox"
+        assert Item.query.filter_by(title="Report").one().bucket.title == "Work"
+
+    def test_existing_buckets_are_used(self, test_client, tmp_path):
+        db.session.add(Bucket(title="Shopping", description="Groceries we need"))
+        db.session.commit()
+        path = _write_jsonl(
+            tmp_path / "items.jsonl",
+            [{"bucket": "Shopping", "title": "Tomatoes"}, {"bucket": "Shopping", "title": "Kale"}],
+        )
+
+        import_items(path, "jsonl", batch_size=1)
+
+        assert Bucket.query.count() == 1
+        assert Bucket.query.one().items.count() == 2
+
+    def test_items_ranked_after_open_items(self, test_client, tmp_path):
+        bucket = Bucket(title="Shopping", description="Groceries we need")
+        bucket.items.append(Item(title="Onions"))
+        db.session.add(bucket)
+        db.session.commit()
+        path = _write_jsonl(
+            tmp_path / "items.jsonl",
+            [{"bucket": "Shopping", "title": "Tomatoes"}, {"bucket": "Shopping", "title": "Kale"}],
+        )
+
+        import_items(path, "jsonl")
+
+        items = Bucket.query.one().incomplete_items
+        assert [item.title for item in items] == ["Onions", "Tomatoes", "Kale"]
+        assert items[0].rank < items[1].rank < items[2].rank
+
+    def test_progress_reported_per_batch(self, test_client, tmp_path):
+        path = _write_jsonl(tmp_path / "items.jsonl", [{"title": f"Item {n}"} for n in range(5)])
+        progress = []
+
+        import_items(path, "jsonl", batch_size=2, progress=progress.append)
+
+        assert progress == [2, 4, 5]
+        assert not (tmp_path / "items.jsonl.checkpoint").exists()
+
+    def test_invalid_record__earlier_batches_kept(self, test_client, tmp_path):
+        path = _write_jsonl(
+            tmp_path / "items.jsonl",
+            [{"title": "Tomatoes"}, {"title": "Kale"}, {"title": ""}],
+        )
+
+        with pytest.raises(InvalidRecord, match="Record 3: title is required"):
+            import_items(path, "jsonl", batch_size=2)
+
+        assert Item.query.count() == 2
+        assert _checkpoint(tmp_path / "items.jsonl.checkpoint") == {"records": 2}
+
+    def test_resumes_from_checkpoint(self, test_client, tmp_path):
+        path = _write_jsonl(
+            tmp_path / "items.jsonl",
+            [{"title": "Tomatoes"}, {"title": "Kale"}, {"title": "Carrots"}],
+        )
+        (tmp_path / "items.jsonl.checkpoint").write_text(json.dumps({"records": 2}))
+
+        records = import_items(path, "jsonl")
+
+        assert records == 3
+        assert [item.title for item in Item.query] == ["Carrots"]
+        assert not (tmp_path / "items.jsonl.checkpoint").exists()
+
+    def test_import_invalidates_cached_pages(self, test_client, tmp_path):
+        bucket = Bucket(title="Shopping", description="Groceries we need")
+        db.session.add(bucket)
+        db.session.commit()
+        test_client.get(f"/bucket/{bucket.id}/")
+        path = _write_jsonl(tmp_path / "items.jsonl", [{"bucket": "Shopping", "title": "Kale"}])
+
+        import_items(path, "jsonl")
+        response = test_client.get(f"/bucket/{bucket.id}/")
+
+        assert b"<td>Kale</td>" in response.data
+
+
+def _write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def _write_jsonl(path, records):
+    return _write(path, "".join(json.dumps(record) + "\n" for record in records))
+
+
+def _checkpoint(path):
+    return json.loads(path.read_text())
@@ -0,0 +1,46 @@
+import json
+
+from unittest.mock import patch
+
+
+class TestInstrumentation:
+    def test_debug__stats_in_response_headers(self, test_client, factory):
+        test_client.application.debug = True
+        bucket = factory.bucket()
+
+        response = test_client.get(f"/bucket/{bucket.id}/?after=0")
+
+        assert int(response.headers["X-SQL-Queries"]) > 0
+        assert float(response.headers["X-SQL-Time-Ms"]) > 0
+        assert float(response.headers["X-Template-Time-Ms"]) > 0
+
+    @patch("src.instrumentation.logger")
+    def test_production__stats_logged(self, mock_logger, test_client, factory):
+        bucket = factory.bucket()
+
+        response = test_client.get(f"/bucket/{bucket.id}/?after=0")
+
+        assert "X-SQL-Queries" not in response.headers
+        level, message = mock_logger.log.call_args.args
+        fields = json.loads(message)
+        assert fields["event"] == "request"
+        assert fields["endpoint"] == "main.bucket"
+        assert fields["status"] == 200
+        assert fields["sql_queries"] > 0
+
+    @patch("src.instrumentation.logger")
+    def test_slow_query_logged(self, mock_logger, test_client, factory):
+        test_client.application.config["SLOW_QUERY_THRESHOLD_MS"] = 0
+        bucket = factory.bucket()
+
+        test_client.get(f"/bucket/{bucket.id}/?after=0")
+
+        logged = [json.loads(call.args[1]) for call in mock_logger.log.call_args_list]
+        slow_queries = [
+            fields
+            for fields in logged
+            if fields["event"] == "slow_query" and fields["endpoint"] == "main.bucket"
+        ]
+        request = [fields for fields in logged if fields["event"] == "request"][0]
+        assert len(slow_queries) == request["sql_queries"]
+        assert slow_queries[-1]["statement"].startswith("SELECT")
@@ -0,0 +1,45 @@
+from prometheus_client import REGISTRY
+
+
+class TestMetrics:
+    def test_metrics(self, test_client, factory):
+        bucket = factory.bucket()
+        test_client.get(f"/bucket/{bucket.id}/")
+
+        response = test_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain")
+        assert (
+            b'my_stuff_request_duration_seconds_count{method="GET",'
+            b'route="/bucket/<int:bucket_id>/",status="200"}' in response.data
+        )
+        assert b"my_stuff_requests_in_flight" in response.data
+
+    def test_request_duration_observed(self, test_client):
+        labels = {"route": "/bucket/create/", "method": "GET", "status": "200"}
+        before = _sample("my_stuff_request_duration_seconds_count", labels)
+
+        test_client.get("/bucket/create/")
+
+        assert _sample("my_stuff_request_duration_seconds_count", labels) == before + 1
+
+    def test_unmatched_route(self, test_client):
+        labels = {"route": "unmatched", "method": "GET", "status": "404"}
+        before = _sample("my_stuff_request_duration_seconds_count", labels)
+
+        test_client.get("/no/such/page/")
+
+        assert _sample("my_stuff_request_duration_seconds_count", labels) == before + 1
+
+    def test_form_validation_failure_counted(self, test_client):
+        labels = {"form": "CreateBucketForm"}
+        before = _sample("my_stuff_form_validation_failures_total", labels)
+
+        test_client.post("/bucket/create/", data={"title": "", "description": ""})
+
+        assert _sample("my_stuff_form_validation_failures_total", labels) == before + 1
+
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
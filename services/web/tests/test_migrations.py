@@ -0,0 +1,45 @@
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import downgrade, upgrade
+
+from src import create_app
+from src.database import db, include_name, Bucket, Item
+from src.search import search_items
+
+
+@pytest.fixture
+def app_context():
+    flask_app = create_app()
+    ctx = flask_app.app_context()
+    ctx.push()
+    yield
+    db.session.remove()
+    ctx.pop()
+
+
+class TestMigrations:
+    def test_upgrade_matches_models(self, app_context):
+        upgrade()
+
+        with db.engine.connect() as connection:
+            migration_context = MigrationContext.configure(
+                connection, opts={"include_name": include_name}
+            )
+            assert compare_metadata(migration_context, db.metadata) == []
+
+    def test_items_are_searchable_after_upgrade(self, app_context):
+        upgrade()
+        bucket = Bucket(title="Shopping", description="Groceries we need")
+        bucket.items.append(Item(title="Tomatoes"))
+        db.session.add(bucket)
+        db.session.commit()
+
+        assert [item.title for item, _ in search_items("tomatoes", 10)[0]] == ["Tomatoes"]
+
+    def test_downgrade_to_base(self, app_context):
+        upgrade()
+
+        downgrade(revision="base")
+
+        assert set(db.inspect(db.engine).get_table_names()) == {"alembic_version"}
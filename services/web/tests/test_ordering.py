@@ -0,0 +1,258 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from src.database import (
+    db,
+    crowded_buckets,
+    move_item_down,
+    move_item_up,
+    move_items_to_bucket,
+    place_item,
+    rank_open_items,
+    Bucket,
+    Item,
+    RANK_STEP,
+)
+
+
+class TestRanks:
+    def test_new_items_go_last(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
+        carrots = factory.item(bucket, "Carrots")
+
+        assert (tomatoes.rank, carrots.rank) == (RANK_STEP, 2 * RANK_STEP)
+        assert _titles(bucket) == ["Tomatoes", "Carrots"]
+
+    def test_completed_items_leave_a_gap_at_the_end(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes")
+        carrots = factory.item(bucket, "Carrots")
+        carrots.completed_time = datetime.utcnow()
+        db.session.commit()
+
+        assert factory.item(bucket, "Potatoes").rank == 2 * RANK_STEP
+
+    def test_moved_items_go_last(self, test_client, factory):
+        bucket = factory.bucket()
+        inbox = factory.bucket("Inbox")
+        factory.item(inbox, "Onions")
+        tomatoes = factory.item(bucket, "Tomatoes")
+        carrots = factory.item(bucket, "Carrots")
+
+        move_items_to_bucket([carrots.id, tomatoes.id], inbox)
+        db.session.commit()
+
+        assert _titles(inbox) == ["Onions", "Tomatoes", "Carrots"]
+
+
+class TestPlaceItem:
+    def test_between_items(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes, carrots, potatoes = factory.items(bucket, ["Tomatoes", "Carrots", "Potatoes"])
+
+        place_item(potatoes, tomatoes)
+        db.session.commit()
+
+        assert _titles(bucket) == ["Tomatoes", "Potatoes", "Carrots"]
+        assert potatoes.rank == RANK_STEP + RANK_STEP // 2
+
+    def test_only_the_item_changes(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes, _, potatoes = factory.items(bucket, ["Tomatoes", "Carrots", "Potatoes"])
+        statements = []
+        event.listen(
+            db.engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        place_item(potatoes, tomatoes)
+        db.session.commit()
+
+        updates = [sql for sql in statements if sql.startswith("UPDATE item ")]
+        assert len(updates) == 1
+        assert "WHERE item.id = ?" in updates[0]
+
+    def test_first_and_last(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes, carrots, potatoes = factory.items(bucket, ["Tomatoes", "Carrots", "Potatoes"])
+
+        place_item(potatoes)
+        place_item(tomatoes, carrots)
+        db.session.commit()
+
+        assert _titles(bucket) == ["Potatoes", "Carrots", "Tomatoes"]
+
+    def test_no_gap_left(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes, carrots, potatoes = factory.items(bucket, ["Tomatoes", "Carrots", "Potatoes"])
+        carrots.rank = tomatoes.rank + 1
+        db.session.commit()
+
+        place_item(potatoes, tomatoes)
+        db.session.commit()
+
+        assert _titles(bucket) == ["Tomatoes", "Potatoes", "Carrots"]
+        assert [item.rank for item in bucket.incomplete_items] == [
+            RANK_STEP,
+            RANK_STEP + RANK_STEP // 2,
+            2 * RANK_STEP,
+        ]
+
+    def test_move_up_and_down(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes, carrots, potatoes = factory.items(bucket, ["Tomatoes", "Carrots", "Potatoes"])
+
+        move_item_up(potatoes)
+        db.session.commit()
+        assert _titles(bucket) == ["Tomatoes", "Potatoes", "Carrots"]
+
+        move_item_up(potatoes)
+        move_item_down(tomatoes)
+        db.session.commit()
+        assert _titles(bucket) == ["Potatoes", "Carrots", "Tomatoes"]
+
+    def test_move_first_up(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes, _ = factory.items(bucket, ["Tomatoes", "Carrots"])
+
+        move_item_up(tomatoes)
+        db.session.commit()
+
+        assert _titles(bucket) == ["Tomatoes", "Carrots"]
+        assert tomatoes.rank == RANK_STEP
+
+
+class TestRankOpenItems:
+    def test_crowded_buckets(self, test_client, factory):
+        bucket = factory.bucket()
+        other_bucket = factory.bucket("Work")
+        tomatoes, carrots = factory.items(bucket, ["Tomatoes", "Carrots"])
+        factory.items(other_bucket, ["Report", "Meeting"])
+        carrots.rank = tomatoes.rank + 10
+        db.session.commit()
+
+        assert crowded_buckets(16) == [bucket.id]
+        assert crowded_buckets(8) == []
+
+    def test_rank_open_items(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes, carrots, potatoes = factory.items(bucket, ["Tomatoes", "Carrots", "Potatoes"])
+        place_item(potatoes)
+        db.session.commit()
+        updated_time = tomatoes.updated_time
+
+        rank_open_items(bucket.id)
+        db.session.commit()
+
+        assert [item.rank for item in bucket.incomplete_items] == [
+            RANK_STEP,
+            2 * RANK_STEP,
+            3 * RANK_STEP,
+        ]
+        assert _titles(bucket) == ["Potatoes", "Tomatoes", "Carrots"]
+        assert db.session.get(Item, tomatoes.id).updated_time == updated_time
+
+
+class TestOrderingViews:
+    def test_bucket_page_in_rank_order(self, test_client, factory):
+        test_client.application.config["BUCKET_PAGE_SIZE"] = 2
+        bucket = factory.bucket()
+        tomatoes, carrots, potatoes = factory.items(bucket, ["Tomatoes", "Carrots", "Potatoes"])
+        place_item(potatoes)
+        db.session.commit()
+
+        first_page = test_client.get(f"/bucket/{bucket.id}/")
+        next_page = test_client.get(f"/bucket/{bucket.id}/?after={tomatoes.id}")
+
+        assert first_page.data.index(b"<td>Potatoes</td>") < first_page.data.index(
+            b"<td>Tomatoes</td>"
+        )
+        assert b"<td>Carrots</td>" not in first_page.data
+        assert f"/bucket/{bucket.id}/?after={tomatoes.id}".encode() in first_page.data
+        assert b"<td>Carrots</td>" in next_page.data
+        assert b"<td>Potatoes</td>" not in next_page.data
+
+    def test_move_up(self, test_client, factory):
+        bucket = factory.bucket()
+        _, carrots = factory.items(bucket, ["Tomatoes", "Carrots"])
+
+        response = test_client.get(
+            f"/bucket/{bucket.id}/item/{carrots.id}/move_up/", follow_redirects=True
+        )
+
+        assert response.status_code == 200
+        assert response.data.index(b"<td>Carrots</td>") < response.data.index(b"<td>Tomatoes</td>")
+
+    def test_move_down(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes, _ = factory.items(bucket, ["Tomatoes", "Carrots"])
+
+        response = test_client.get(
+            f"/bucket/{bucket.id}/item/{tomatoes.id}/move_down/", follow_redirects=True
+        )
+
+        assert response.status_code == 200
+        assert _titles(bucket) == ["Carrots", "Tomatoes"]
+
+    def test_item_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
+
+        response = test_client.get(f"/bucket/{bucket.id}/item/9/move_up/")
+
+        assert response.status_code == 404
+
+
+class TestPlaceApi:
+    def test_place_after(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes, carrots, potatoes = factory.items(bucket, ["Tomatoes", "Carrots", "Potatoes"])
+
+        response = test_client.post(
+            f"/api/v1/items/{potatoes.id}/place/", json={"after_id": tomatoes.id}
+        )
+
+        assert response.status_code == 200
+        assert response.json["id"] == potatoes.id
+        assert _titles(bucket) == ["Tomatoes", "Potatoes", "Carrots"]
+
+    def test_place_first(self, test_client, factory):
+        bucket = factory.bucket()
+        _, carrots = factory.items(bucket, ["Tomatoes", "Carrots"])
+
+        response = test_client.post(f"/api/v1/items/{carrots.id}/place/", json={"after_id": None})
+
+        assert response.status_code == 200
+        assert _titles(bucket) == ["Carrots", "Tomatoes"]
+
+    def test_after_item_in_other_bucket__400_error(self, test_client, factory):
+        tomatoes = factory.item(factory.bucket(), "Tomatoes")
+        report = factory.item(factory.bucket("Work"), "Report")
+
+        response = test_client.post(
+            f"/api/v1/items/{tomatoes.id}/place/", json={"after_id": report.id}
+        )
+
+        assert response.status_code == 400
+
+    def test_after_id_missing__400_error(self, test_client, factory):
+        tomatoes = factory.item(factory.bucket(), "Tomatoes")
+
+        response = test_client.post(f"/api/v1/items/{tomatoes.id}/place/", json={})
+
+        assert response.status_code == 400
+
+    def test_completed_item__404_error(self, test_client, factory):
+        tomatoes = factory.item(factory.bucket(), "Tomatoes")
+        tomatoes.completed_time = datetime.utcnow()
+        db.session.commit()
+
+        response = test_client.post(f"/api/v1/items/{tomatoes.id}/place/", json={"after_id": None})
+
+        assert response.status_code == 404
+
+
+def _titles(bucket):
+    return [item.title for item in db.session.get(Bucket, bucket.id).incomplete_items]
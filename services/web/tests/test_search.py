@@ -0,0 +1,129 @@
+from src.database import db
+from src.search import search_items
+
+
+class TestSearchItems:
+    def test_title_and_description_searched(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes")
+        factory.item(bucket, "Salad", description="Lettuce and tomatoes")
+        factory.item(bucket, "Carrots")
+
+        results, has_next_page = search_items("tomatoes", 10)
+
+        assert sorted(item.title for item, _ in results) == ["Salad", "Tomatoes"]
+        assert {bucket_title for _, bucket_title in results} == {"Shopping"}
+        assert not has_next_page
+
+    def test_all_words_must_match(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Red tomatoes")
+        factory.item(bucket, "Green tomatoes")
+
+        results, _ = search_items("green tomatoes", 10)
+
+        assert [item.title for item, _ in results] == ["Green tomatoes"]
+
+    def test_words_are_stemmed(self, test_client, factory):
+        factory.item(factory.bucket(), "Tomatoes")
+
+        results, _ = search_items("tomato", 10)
+
+        assert [item.title for item, _ in results] == ["Tomatoes"]
+
+    def test_query_syntax_is_searched_as_text(self, test_client, factory):
+        factory.item(factory.bucket(), "Tomatoes")
+
+        results, _ = search_items('tomatoes" OR (NEAR', 10)
+
+        assert results == []
+
+    def test_changes_to_items_are_searchable(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
+        carrots = factory.item(bucket, "Carrots")
+
+        tomatoes.title = "Potatoes"
+        db.session.delete(carrots)
+        db.session.commit()
+
+        assert search_items("tomatoes", 10)[0] == []
+        assert search_items("carrots", 10)[0] == []
+        assert [item.title for item, _ in search_items("potatoes", 10)[0]] == ["Potatoes"]
+
+    def test_pagination(self, test_client, factory):
+        bucket = factory.bucket()
+        for number in range(3):
+            factory.item(bucket, f"Tomatoes {number}")
+
+        first_page, first_has_next_page = search_items("tomatoes", 2)
+        second_page, second_has_next_page = search_items("tomatoes", 2, page=2)
+
+        assert len(first_page) == 2 and first_has_next_page
+        assert len(second_page) == 1 and not second_has_next_page
+
+    def test_empty_search(self, test_client, factory):
+        factory.item(factory.bucket(), "Tomatoes")
+
+        assert search_items("  ", 10) == ([], False)
+
+
+class TestSearchPage:
+    def test_results(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes")
+
+        response = test_client.get("/search/?q=tomatoes")
+
+        assert response.status_code == 200
+        assert f'<a href="/bucket/{bucket.id}/">Shopping</a>'.encode() in response.data
+        assert b">Tomatoes</a>" in response.data
+
+    def test_no_results(self, test_client):
+        response = test_client.get("/search/?q=tomatoes")
+
+        assert b"No items found" in response.data
+
+    def test_item_changed_through_view_is_searchable(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket, "Tomatoes")
+
+        test_client.post(
+            f"/bucket/{bucket.id}/item/{item.id}/update/",
+            data={"title": "Potatoes", "description": "", "due_date": ""},
+        )
+        response = test_client.get("/search/?q=potatoes")
+
+        assert b">Potatoes</a>" in response.data
+
+
+class TestSearchApi:
+    def test_results(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes")
+
+        response = test_client.get("/api/v1/search/?q=tomatoes")
+
+        assert response.status_code == 200
+        assert [item["title"] for item in response.json["items"]] == ["Tomatoes"]
+        assert response.json["items"][0]["bucket"] == "Shopping"
+        assert response.json["next_page"] is None
+
+    def test_limit_below_one__one_item(self, test_client, factory):
+        bucket = factory.bucket()
+        factory.item(bucket, "Tomatoes")
+        factory.item(bucket, "Cherry tomatoes")
+
+        for limit in (0, -3):
+            response = test_client.get(f"/api/v1/search/?q=tomatoes&limit={limit}")
+
+            assert len(response.json["items"]) == 1
+            assert response.json["next_page"] == 2
+
+    def test_bulk_deleted_items_are_not_found(self, test_client, factory):
+        item = factory.item(factory.bucket(), "Tomatoes")
+
+        test_client.post("/api/v1/items/delete/", json={"ids": [item.id]})
+        response = test_client.get("/api/v1/search/?q=tomatoes")
+
+        assert response.json["items"] == []
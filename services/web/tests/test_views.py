@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, datetime
 
 from unittest.mock import patch
 
@@ -6,9 +6,9 @@ from src.database import db, Bucket, Item
 
 
 class TestHomePage:
-    def test_redirects_to_inbox_bucket_page(self, test_client):
-        _create_inbox_bucket()
-        _create_bucket(title="Shopping", description="Groceries we need")
+    def test_redirects_to_inbox_bucket_page(self, test_client, factory):
+        factory.bucket(title="Inbox", description="Random things")
+        factory.bucket(title="Shopping", description="Groceries we need")
 
         response = test_client.get("/", follow_redirects=True)
 
@@ -25,9 +25,9 @@ class TestHomePage:
 
 
 class TestBucketPage:
-    def test_bucket_page(self, test_client):
-        _create_inbox_bucket()
-        bucket = _create_bucket(
+    def test_bucket_page(self, test_client, factory):
+        factory.bucket(title="Inbox", description="Random things")
+        bucket = factory.bucket(
             title="Shopping",
             description="Groceries we need",
             item_titles=["Tomatoes", "Carrots"],
@@ -43,6 +43,30 @@ class TestBucketPage:
         assert b"<td>Tomatoes</td>" in response.data
         assert b"<td>Carrots</td>" in response.data
 
+    def test_navigation_shows_open_item_counts(self, test_client, factory):
+        inbox = factory.bucket(title="Inbox", description="Random things")
+        bucket = factory.bucket(item_titles=["Tomatoes", "Carrots"])
+        completed = factory.item(bucket, "Potatoes")
+        completed.completed_time = datetime(2020, 7, 28, 8, 4)
+        db.session.commit()
+
+        response = test_client.get(f"/bucket/{bucket.id}/")
+
+        assert response.status_code == 200
+        assert f'<a href="/bucket/{inbox.id}">Inbox (0)</a>'.encode() in response.data
+        assert f'<a href="/bucket/{bucket.id}">Shopping (2)</a>'.encode() in response.data
+
+    def test_due_dates(self, test_client, factory):
+        bucket = factory.bucket()
+        overdue = factory.item(bucket, "Tomatoes", due_date=date(2020, 1, 30))
+        factory.item(bucket, "Carrots", due_date=date(2020, 1, 30))
+
+        response = test_client.get(f"/bucket/{bucket.id}/")
+
+        assert response.status_code == 200
+        assert f'<tr id="item-{overdue.id}" class="top-align overdue">'.encode() in response.data
+        assert response.data.count(b'<td class="min">Jan 30 2020</td>') == 2
+
     def test_bucket_not_found__404_error(self, test_client):
         unknown_bucket_id = 9
 
@@ -50,8 +74,8 @@ class TestBucketPage:
 
         assert response.status_code == 404
 
-    def test_quick_create_item(self, test_client):
-        bucket = _create_bucket(
+    def test_quick_create_item(self, test_client, factory):
+        bucket = factory.bucket(
             title="Shopping",
             description="Groceries we need",
             item_titles=["Tomatoes"],
@@ -69,22 +93,80 @@ class TestBucketPage:
         assert item.completed_time is None
         assert not item.flagged
 
-    def test_title_not_provided__validation_error(self, test_client):
-        bucket = _create_bucket()
+    def test_title_not_provided__validation_error(self, test_client, factory):
+        bucket = factory.bucket()
 
         response = test_client.post(f"/bucket/{bucket.id}/", data={"title": ""})
 
         assert response.status_code == 200
         assert b"Enter a title." in response.data
 
-    def test_title_too_long__validation_error(self, test_client):
-        bucket = _create_bucket()
+    def test_title_too_long__validation_error(self, test_client, factory):
+        bucket = factory.bucket()
 
         response = test_client.post(f"/bucket/{bucket.id}/", data={"title": "a" * 129})
 
         assert response.status_code == 200
         assert b"No longer than 128 characters." in response.data
 
+    def test_csrf_token_missing__validation_error(self, test_client, factory):
+        test_client.application.config["WTF_CSRF_ENABLED"] = True
+        bucket = factory.bucket()
+
+        response = test_client.post(f"/bucket/{bucket.id}/", data={"title": "Zucchini"})
+
+        assert response.status_code == 200
+        assert b"The CSRF token is missing." in response.data
+        assert _get_item("Zucchini") is None
+
+
+class TestBucketPagination:
+    def test_first_page(self, test_client, factory):
+        test_client.application.config["BUCKET_PAGE_SIZE"] = 2
+        bucket = factory.bucket(item_titles=["Tomatoes", "Carrots", "Potatoes"])
+        carrots = _get_item("Carrots")
+
+        response = test_client.get(f"/bucket/{bucket.id}/")
+
+        assert response.status_code == 200
+        assert b"<td>Tomatoes</td>" in response.data
+        assert b"<td>Carrots</td>" in response.data
+        assert b"<td>Potatoes</td>" not in response.data
+        assert f"/bucket/{bucket.id}/?after={carrots.id}".encode() in response.data
+
+    def test_next_page(self, test_client, factory):
+        test_client.application.config["BUCKET_PAGE_SIZE"] = 2
+        bucket = factory.bucket(item_titles=["Tomatoes", "Carrots", "Potatoes"])
+        carrots = _get_item("Carrots")
+
+        response = test_client.get(f"/bucket/{bucket.id}/?after={carrots.id}")
+
+        assert response.status_code == 200
+        assert b"<td>Tomatoes</td>" not in response.data
+        assert b"<td>Potatoes</td>" in response.data
+        assert b'<tr class="more"' not in response.data
+
+    def test_items_fragment(self, test_client, factory):
+        test_client.application.config["BUCKET_PAGE_SIZE"] = 1
+        bucket = factory.bucket(item_titles=["Tomatoes", "Carrots", "Potatoes"])
+        tomatoes = _get_item("Tomatoes")
+        carrots = _get_item("Carrots")
+
+        response = test_client.get(f"/bucket/{bucket.id}/items/?after={tomatoes.id}")
+
+        assert response.status_code == 200
+        assert b"<html>" not in response.data
+        assert b"<td>Carrots</td>" in response.data
+        assert b"<td>Potatoes</td>" not in response.data
+        assert f"/bucket/{bucket.id}/items/?after={carrots.id}".encode() in response.data
+
+    def test_items_fragment_bucket_not_found__404_error(self, test_client):
+        unknown_bucket_id = 9
+
+        response = test_client.get(f"/bucket/{unknown_bucket_id}/items/")
+
+        assert response.status_code == 404
+
 
 class TestCreateBucket:
     def test_create_bucket__get(self, test_client):
@@ -92,8 +174,8 @@ class TestCreateBucket:
 
         assert response.status_code == 200
 
-    def test_create_bucket__post(self, test_client):
-        _create_inbox_bucket()
+    def test_create_bucket__post(self, test_client, factory):
+        factory.bucket(title="Inbox", description="Random things")
 
         response = test_client.post(
             "/bucket/create/",
@@ -127,8 +209,8 @@ class TestCreateBucket:
         assert response.status_code == 200
         assert b"No longer than 32 characters." in response.data
 
-    def test_title_already_exists__validation_error(self, test_client):
-        _create_bucket(title="Shopping")
+    def test_title_already_exists__validation_error(self, test_client, factory):
+        factory.bucket(title="Shopping")
 
         response = test_client.post(
             "/bucket/create/",
@@ -138,6 +220,22 @@ class TestCreateBucket:
         assert response.status_code == 200
         assert b"Bucket title must be unique." in response.data
 
+    @patch("src.forms._bucket_title_exists")
+    def test_title_taken_before_commit__validation_error(
+        self, mock_title_exists, test_client, factory
+    ):
+        factory.bucket(title="Shopping")
+        mock_title_exists.return_value = False
+
+        response = test_client.post(
+            "/bucket/create/",
+            data={"title": "Shopping", "description": "List of groceries"},
+        )
+
+        assert response.status_code == 200
+        assert b"Bucket title must be unique." in response.data
+        assert Bucket.query.filter_by(title="Shopping").count() == 1
+
     def test_description_not_provided__validation_error(self, test_client):
         response = test_client.post(
             "/bucket/create/",
@@ -149,15 +247,15 @@ class TestCreateBucket:
 
 
 class TestUpdateBucket:
-    def test_update_bucket__get(self, test_client):
-        bucket = _create_bucket(title="Shopping")
+    def test_update_bucket__get(self, test_client, factory):
+        bucket = factory.bucket(title="Shopping")
 
         response = test_client.get(f"/bucket/{bucket.id}/update/")
 
         assert response.status_code == 200
 
-    def test_update_bucket__post(self, test_client):
-        bucket = _create_bucket(title="Shopping", description="List of groceries")
+    def test_update_bucket__post(self, test_client, factory):
+        bucket = factory.bucket(title="Shopping", description="List of groceries")
 
         response = test_client.post(
             f"/bucket/{bucket.id}/update/",
@@ -173,8 +271,8 @@ class TestUpdateBucket:
         assert bucket.can_deactivate
         assert bucket.deactivated_time is None
 
-    def test_update_where_data_does_not_change(self, test_client):
-        bucket = _create_bucket(title="Shopping", description="List of groceries")
+    def test_update_where_data_does_not_change(self, test_client, factory):
+        bucket = factory.bucket(title="Shopping", description="List of groceries")
 
         response = test_client.post(
             f"/bucket/{bucket.id}/update/",
@@ -189,8 +287,8 @@ class TestUpdateBucket:
         assert bucket.title == "Shopping"
         assert bucket.description == "List of groceries"
 
-    def test_title_not_provided__validation_error(self, test_client):
-        bucket = _create_bucket(title="Shopping")
+    def test_title_not_provided__validation_error(self, test_client, factory):
+        bucket = factory.bucket(title="Shopping")
 
         response = test_client.post(
             f"/bucket/{bucket.id}/update/",
@@ -200,8 +298,8 @@ class TestUpdateBucket:
         assert response.status_code == 200
         assert b"Enter a title." in response.data
 
-    def test_title_too_long__validation_error(self, test_client):
-        bucket = _create_bucket(title="Shopping")
+    def test_title_too_long__validation_error(self, test_client, factory):
+        bucket = factory.bucket(title="Shopping")
 
         response = test_client.post(
             f"/bucket/{bucket.id}/update/",
@@ -211,9 +309,9 @@ class TestUpdateBucket:
         assert response.status_code == 200
         assert b"No longer than 32 characters." in response.data
 
-    def test_title_already_exists__validation_error(self, test_client):
-        _create_bucket(title="Stuff to buy")
-        bucket = _create_bucket(title="Shopping")
+    def test_title_already_exists__validation_error(self, test_client, factory):
+        factory.bucket(title="Stuff to buy")
+        bucket = factory.bucket(title="Shopping")
 
         response = test_client.post(
             f"/bucket/{bucket.id}/update/",
@@ -223,8 +321,25 @@ class TestUpdateBucket:
         assert response.status_code == 200
         assert b"Bucket title must be unique." in response.data
 
-    def test_description_not_provided__validation_error(self, test_client):
-        bucket = _create_bucket(title="Shopping")
+    @patch("src.forms._bucket_title_exists")
+    def test_title_taken_before_commit__validation_error(
+        self, mock_title_exists, test_client, factory
+    ):
+        factory.bucket(title="Stuff to buy")
+        bucket = factory.bucket(title="Shopping")
+        mock_title_exists.return_value = False
+
+        response = test_client.post(
+            f"/bucket/{bucket.id}/update/",
+            data={"title": "Stuff to buy", "description": "List of groceries"},
+        )
+
+        assert response.status_code == 200
+        assert b"Bucket title must be unique." in response.data
+        assert _get_bucket("Shopping") is not None
+
+    def test_description_not_provided__validation_error(self, test_client, factory):
+        bucket = factory.bucket(title="Shopping")
 
         response = test_client.post(
             f"/bucket/{bucket.id}/update/",
@@ -236,15 +351,15 @@ class TestUpdateBucket:
 
 
 class TestCreateItem:
-    def test_create_item__get(self, test_client):
-        bucket = _create_bucket()
+    def test_create_item__get(self, test_client, factory):
+        bucket = factory.bucket()
 
         response = test_client.get(f"/bucket/{bucket.id}/item/create/")
 
         assert response.status_code == 200
 
-    def test_create_item__post(self, test_client):
-        bucket = _create_bucket()
+    def test_create_item__post(self, test_client, factory):
+        bucket = factory.bucket()
 
         response = test_client.post(
             f"/bucket/{bucket.id}/item/create/",
@@ -267,8 +382,8 @@ class TestCreateItem:
         assert item.completed_time is None
         assert item.flagged
 
-    def test_only_supplying_required_fields(self, test_client):
-        bucket = _create_bucket()
+    def test_only_supplying_required_fields(self, test_client, factory):
+        bucket = factory.bucket()
 
         response = test_client.post(
             f"/bucket/{bucket.id}/item/create/",
@@ -297,24 +412,24 @@ class TestCreateItem:
 
         assert response.status_code == 404
 
-    def test_title_not_provided__validation_error(self, test_client):
-        bucket = _create_bucket()
+    def test_title_not_provided__validation_error(self, test_client, factory):
+        bucket = factory.bucket()
 
         response = test_client.post(f"/bucket/{bucket.id}/item/create/", data={"title": ""})
 
         assert response.status_code == 200
         assert b"Enter a title." in response.data
 
-    def test_title_too_long__validation_error(self, test_client):
-        bucket = _create_bucket()
+    def test_title_too_long__validation_error(self, test_client, factory):
+        bucket = factory.bucket()
 
         response = test_client.post(f"/bucket/{bucket.id}/item/create/", data={"title": "a" * 129})
 
         assert response.status_code == 200
         assert b"No longer than 128 characters." in response.data
 
-    def test_due_date_invalid_format__validation_error(self, test_client):
-        bucket = _create_bucket()
+    def test_due_date_invalid_format__validation_error(self, test_client, factory):
+        bucket = factory.bucket()
 
         response = test_client.post(
             f"/bucket/{bucket.id}/item/create/",
@@ -326,17 +441,17 @@ class TestCreateItem:
 
 
 class TestUpdateItem:
-    def test_update_item__get(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket)
+    def test_update_item__get(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket)
 
         response = test_client.get(f"/bucket/{bucket.id}/item/{item.id}/update/")
 
         assert response.status_code == 200
 
-    def test_update_item__post(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket, "Tomatoes")
+    def test_update_item__post(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket, "Tomatoes")
 
         response = test_client.post(
             f"/bucket/{bucket.id}/item/{item.id}/update/",
@@ -360,9 +475,9 @@ class TestUpdateItem:
         assert updated_item.completed_time is None
         assert updated_item.flagged
 
-    def test_bucket_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket)
+    def test_bucket_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket)
         bucket_id = 9
 
         response = test_client.post(
@@ -373,8 +488,8 @@ class TestUpdateItem:
 
         assert response.status_code == 404
 
-    def test_item_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
+    def test_item_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
         item_id = 9
 
         response = test_client.post(
@@ -385,9 +500,9 @@ class TestUpdateItem:
 
         assert response.status_code == 404
 
-    def test_title_not_provided__validation_error(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket)
+    def test_title_not_provided__validation_error(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket)
 
         response = test_client.post(
             f"/bucket/{bucket.id}/item/{item.id}/update/", data={"title": ""}
@@ -396,9 +511,9 @@ class TestUpdateItem:
         assert response.status_code == 200
         assert b"Enter a title." in response.data
 
-    def test_title_too_long__validation_error(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket)
+    def test_title_too_long__validation_error(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket)
 
         response = test_client.post(
             f"/bucket/{bucket.id}/item/{item.id}/update/", data={"title": "a" * 129}
@@ -407,9 +522,9 @@ class TestUpdateItem:
         assert response.status_code == 200
         assert b"No longer than 128 characters." in response.data
 
-    def test_due_date_invalid_format__validation_error(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket)
+    def test_due_date_invalid_format__validation_error(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket)
 
         response = test_client.post(
             f"/bucket/{bucket.id}/item/{item.id}/update/",
@@ -419,12 +534,91 @@ class TestUpdateItem:
         assert response.status_code == 200
         assert b"Not a valid date value" in response.data
 
+    def test_move_to_other_bucket(self, test_client, factory):
+        bucket = factory.bucket()
+        inbox = factory.bucket(title="Inbox", description="Random things")
+        item = factory.item(bucket, "Tomatoes", flagged=True)
+        created_time = item.created_time
+
+        response = test_client.post(
+            f"/bucket/{bucket.id}/item/{item.id}/update/",
+            data={"title": "Tomatoes", "flagged": True, "bucket_id": inbox.id},
+            follow_redirects=True,
+        )
+
+        assert response.status_code == 200
+        assert b"<td>Tomatoes</td>" not in response.data
+        moved_item = _get_item("Tomatoes")
+        assert moved_item.bucket_id == inbox.id
+        assert moved_item.created_time == created_time
+        assert (_get_bucket("Inbox").open_count, _get_bucket("Inbox").flagged_count) == (1, 1)
+        assert _get_bucket("Shopping").open_count == 0
+
+
+class TestMoveItems:
+    def test_move_items(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes", "Carrots", "Potatoes"])
+        inbox = factory.bucket(title="Inbox", description="Random things")
+        tomatoes, carrots = _get_item("Tomatoes"), _get_item("Carrots")
+
+        response = test_client.post(
+            f"/bucket/{bucket.id}/items/move/",
+            data={"move-item_ids": [tomatoes.id, carrots.id], "move-bucket_id": inbox.id},
+            follow_redirects=True,
+        )
+
+        assert response.status_code == 200
+        assert b"<td>Tomatoes</td>" not in response.data
+        assert b"<td>Potatoes</td>" in response.data
+        assert [item.title for item in _get_bucket("Inbox").incomplete_items] == [
+            "Tomatoes",
+            "Carrots",
+        ]
+        assert f'<a href="/bucket/{inbox.id}">Inbox (2)</a>'.encode() in response.data
+        assert f'<a href="/bucket/{bucket.id}">Shopping (1)</a>'.encode() in response.data
+
+    def test_bucket_page_has_move_form(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+        inbox = factory.bucket(title="Inbox", description="Random things")
+
+        response = test_client.get(f"/bucket/{bucket.id}/")
+
+        assert b'name="move-item_ids" value="1" form="move-items"' in response.data
+        assert f'<option value="{inbox.id}">Inbox</option>'.encode() in response.data
+
+    def test_no_items_selected(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+        inbox = factory.bucket(title="Inbox", description="Random things")
+
+        response = test_client.post(
+            f"/bucket/{bucket.id}/items/move/", data={"move-bucket_id": inbox.id}
+        )
+
+        assert response.status_code == 302
+        assert _get_item("Tomatoes").bucket_id == bucket.id
+
+    def test_unknown_bucket__not_moved(self, test_client, factory):
+        bucket = factory.bucket(item_titles=["Tomatoes"])
+        tomatoes = _get_item("Tomatoes")
+
+        test_client.post(
+            f"/bucket/{bucket.id}/items/move/",
+            data={"move-item_ids": [tomatoes.id], "move-bucket_id": 9},
+        )
+
+        assert _get_item("Tomatoes").bucket_id == bucket.id
+
+    def test_bucket_not_found__404_error(self, test_client):
+        response = test_client.post("/bucket/9/items/move/", data={"move-bucket_id": 1})
+
+        assert response.status_code == 404
+
 
 class TestCompleteItem:
-    def test_complete_item(self, test_client):
-        bucket = _create_bucket()
-        tomatoes = _create_item(bucket, "Tomatoes")
-        _create_item(bucket, "Carrots")
+    def test_complete_item(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
+        factory.item(bucket, "Carrots")
 
         response = test_client.get(
             f"/bucket/{bucket.id}/item/{tomatoes.id}/complete/",
@@ -437,17 +631,17 @@ class TestCompleteItem:
         item = _get_item("Tomatoes")
         assert item.completed_time is not None
 
-    def test_item_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
+    def test_item_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
         item_id = 9
 
         response = test_client.get(f"/bucket/{bucket.id}/item/{item_id}/complete/")
 
         assert response.status_code == 404
 
-    def test_bucket_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket)
+    def test_bucket_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket)
         bucket_id = 9
 
         response = test_client.get(f"/bucket/{bucket_id}/item/{item.id}/complete/")
@@ -455,10 +649,62 @@ class TestCompleteItem:
         assert response.status_code == 404
 
 
+class TestItemActionFragments:
+    def test_flag_item__returns_updated_row(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
+
+        response = test_client.get(
+            f"/bucket/{bucket.id}/item/{tomatoes.id}/flag/",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+
+        assert response.status_code == 200
+        assert b"<html>" not in response.data
+        assert f'<tr id="item-{tomatoes.id}" class="top-align flagged">'.encode() in response.data
+        assert f"/item/{tomatoes.id}/unflag/".encode() in response.data
+
+    def test_due_date_plus_one_day__returns_updated_row(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes", due_date=date(2020, 1, 1))
+
+        response = test_client.get(
+            f"/bucket/{bucket.id}/item/{tomatoes.id}/due_date_plus_one_day/",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+
+        assert response.status_code == 200
+        assert b"Jan 02 2020" in response.data
+
+    def test_complete_item__no_content(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
+
+        response = test_client.get(
+            f"/bucket/{bucket.id}/item/{tomatoes.id}/complete/",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+
+        assert response.status_code == 204
+        assert _get_item("Tomatoes").completed_time is not None
+
+    def test_delete_item__no_content(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
+
+        response = test_client.get(
+            f"/bucket/{bucket.id}/item/{tomatoes.id}/delete/",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+
+        assert response.status_code == 204
+        assert _get_item("Tomatoes") is None
+
+
 class TestItemDueDatePlusOneDay:
-    def test_item_due_date_plus_one_day(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket, "New house", due_date=date(2020, 1, 1))
+    def test_item_due_date_plus_one_day(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket, "New house", due_date=date(2020, 1, 1))
 
         response = test_client.get(
             f"/bucket/{bucket.id}/item/{item.id}/due_date_plus_one_day/",
@@ -470,9 +716,9 @@ class TestItemDueDatePlusOneDay:
         assert item.due_date == date(2020, 1, 2)
 
     @patch("src.views.date")
-    def test_no_due_date_set__due_date_is_tomorrow(self, mock_date_lib, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket, "New house", due_date=None)
+    def test_no_due_date_set__due_date_is_tomorrow(self, mock_date_lib, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket, "New house", due_date=None)
         mock_date_lib.today.return_value = date(2020, 1, 1)
 
         response = test_client.get(
@@ -484,17 +730,17 @@ class TestItemDueDatePlusOneDay:
         item = _get_item("New house")
         assert item.due_date == date(2020, 1, 2)
 
-    def test_item_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
+    def test_item_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
         item_id = 9
 
         response = test_client.get(f"/bucket/{bucket.id}/item/{item_id}/due_date_plus_one_day/")
 
         assert response.status_code == 404
 
-    def test_bucket_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket)
+    def test_bucket_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket)
         bucket_id = 9
 
         response = test_client.get(f"/bucket/{bucket_id}/item/{item.id}/due_date_plus_one_day/")
@@ -503,9 +749,9 @@ class TestItemDueDatePlusOneDay:
 
 
 class TestFlagItem:
-    def test_flag_item(self, test_client):
-        bucket = _create_bucket()
-        tomatoes = _create_item(bucket, "Tomatoes")
+    def test_flag_item(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
 
         response = test_client.get(
             f"/bucket/{bucket.id}/item/{tomatoes.id}/flag/",
@@ -516,9 +762,9 @@ class TestFlagItem:
         item = _get_item("Tomatoes")
         assert item.flagged
 
-    def test_item_already_flagged__remains_flagged(self, test_client):
-        bucket = _create_bucket()
-        tomatoes = _create_item(bucket, "Tomatoes", flagged=True)
+    def test_item_already_flagged__remains_flagged(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes", flagged=True)
 
         response = test_client.get(
             f"/bucket/{bucket.id}/item/{tomatoes.id}/flag/",
@@ -529,17 +775,17 @@ class TestFlagItem:
         item = _get_item("Tomatoes")
         assert item.flagged
 
-    def test_item_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
+    def test_item_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
         item_id = 9
 
         response = test_client.get(f"/bucket/{bucket.id}/item/{item_id}/flag/")
 
         assert response.status_code == 404
 
-    def test_bucket_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket)
+    def test_bucket_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket)
         bucket_id = 9
 
         response = test_client.get(f"/bucket/{bucket_id}/item/{item.id}/flag/")
@@ -548,9 +794,9 @@ class TestFlagItem:
 
 
 class TestUnflagItem:
-    def test_unflag_item(self, test_client):
-        bucket = _create_bucket()
-        tomatoes = _create_item(bucket, "Tomatoes", flagged=True)
+    def test_unflag_item(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes", flagged=True)
 
         response = test_client.get(
             f"/bucket/{bucket.id}/item/{tomatoes.id}/unflag/",
@@ -561,9 +807,9 @@ class TestUnflagItem:
         item = _get_item("Tomatoes")
         assert not item.flagged
 
-    def test_item_not_flagged__remains_unflagged(self, test_client):
-        bucket = _create_bucket()
-        tomatoes = _create_item(bucket, "Tomatoes", flagged=False)
+    def test_item_not_flagged__remains_unflagged(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes", flagged=False)
 
         response = test_client.get(
             f"/bucket/{bucket.id}/item/{tomatoes.id}/unflag/",
@@ -574,17 +820,17 @@ class TestUnflagItem:
         item = _get_item("Tomatoes")
         assert not item.flagged
 
-    def test_item_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
+    def test_item_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
         item_id = 9
 
         response = test_client.get(f"/bucket/{bucket.id}/item/{item_id}/unflag/")
 
         assert response.status_code == 404
 
-    def test_bucket_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket)
+    def test_bucket_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket)
         bucket_id = 9
 
         response = test_client.get(f"/bucket/{bucket_id}/item/{item.id}/unflag/")
@@ -593,10 +839,10 @@ class TestUnflagItem:
 
 
 class TestDeleteItem:
-    def test_delete_item(self, test_client):
-        bucket = _create_bucket()
-        tomatoes = _create_item(bucket, "Tomatoes")
-        _create_item(bucket, "Carrots")
+    def test_delete_item(self, test_client, factory):
+        bucket = factory.bucket()
+        tomatoes = factory.item(bucket, "Tomatoes")
+        factory.item(bucket, "Carrots")
 
         response = test_client.get(
             f"/bucket/{bucket.id}/item/{tomatoes.id}/delete/",
@@ -608,17 +854,17 @@ class TestDeleteItem:
         assert b"<td>Carrots</td>" in response.data
         assert Item.query.get(tomatoes.id) is None
 
-    def test_item_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
+    def test_item_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
         item_id = 9
 
         response = test_client.get(f"/bucket/{bucket.id}/item/{item_id}/delete/")
 
         assert response.status_code == 404
 
-    def test_bucket_not_found__404_error(self, test_client):
-        bucket = _create_bucket()
-        item = _create_item(bucket)
+    def test_bucket_not_found__404_error(self, test_client, factory):
+        bucket = factory.bucket()
+        item = factory.item(bucket)
         bucket_id = 9
 
         response = test_client.get(f"/bucket/{bucket_id}/item/{item.id}/delete/")
@@ -626,36 +872,6 @@ class TestDeleteItem:
         assert response.status_code == 404
 
 
-def _create_inbox_bucket():
-    return _create_bucket(title="Inbox", description="Random things")
-
-
-def _create_bucket(
-    title="Shopping",
-    description="Groceries we need",
-    item_titles=None,
-):
-    bucket = Bucket(title=title, description=description)
-    for item_title in item_titles or list():
-        bucket.items.append(Item(title=item_title))
-    db.session.add(bucket)
-    db.session.commit()
-    return bucket
-
-
-def _create_item(bucket, title="Task", description=None, due_date=None, flagged=False):
-    item = Item(
-        bucket=bucket,
-        title=title,
-        description=description,
-        due_date=due_date,
-        flagged=flagged,
-    )
-    db.session.add(item)
-    db.session.commit()
-    return item
-
-
 def _get_bucket(title):
     return db.session.query(Bucket).filter_by(title=title).first()
 